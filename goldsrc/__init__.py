@@ -2,16 +2,21 @@ from .engine import Engine
 from .renderer import Renderer
 from .scene import Scene
 from .entity import Entity
-from .model import BasicModel, MultiMaterialModel, BasicAnimatedModel, MultiMaterialAnimatedModel, Model
+from .model import BasicModel, MultiMaterialModel, BasicAnimatedModel, MultiMaterialAnimatedModel, Model, AnimationClock, InstancedModel, ModelInstance
 from .camera import Camera
 from .light import BasicLight
 from .skybox import Skybox
+from .bounds import Bounds, Frustum
+from .spatial import SpatialIndex
+from .batching import StaticGeometry
 from .collision import ColliderShape
 from . import collision
 from . import factory
 from . import hwinfo
 from . import input
+from . import lod
 from . import math
+from . import meshcache
 from . import objparser
 from . import path
 from . import ui
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""
+
+    GoldSrc Python
+    MIT © Kadir Aksoy
+    https://github.com/kadir014/goldsrc-python
+
+"""
+
+from typing import Optional, TYPE_CHECKING
+
+from collections.abc import Iterable
+
+import moderngl
+import glm
+import numpy as np
+
+from .objparser import ObjMesh
+from .model import Model, BasicModel, MultiMaterialModel, InstancedModel
+from .texturecache import SharedTexture
+from .bounds import Bounds, Frustum
+
+if TYPE_CHECKING:
+    from .engine import Engine
+    from .entity import Entity
+
+
+# Edge length of the world space grid cells static geometry is split into
+DEFAULT_CHUNK_SIZE = 16.0
+
+
+class StaticChunk:
+    """
+    World space geometry of static entities in one grid cell that share a
+    shader program, texture and color, drawn with one call.
+    """
+
+    def __init__(self,
+            engine: "Engine",
+            program_name: str,
+            texture: Optional[SharedTexture],
+            color: glm.vec4,
+            wireframe: bool,
+            mesh: ObjMesh
+            ):
+        self.engine = engine
+        self.program_name = program_name
+        self.color = color
+        self.wireframe = wireframe
+
+        self.program = self.engine.renderer.get_shader(program_name)
+        self.uniforms = self.engine.renderer.uniforms(self.program)
+
+        self.texture = None if texture is None else texture.acquire()
+
+        self.bounds = Bounds.from_points(mesh.vertices)
+        self.draw_count = mesh.draw_count
+
+        self.vbo = self.engine.renderer.create_bo(mesh.data)
+        self.ibo = self.engine.renderer.create_bo(mesh.indices)
+        self.vao = self.engine.renderer.create_vao(self.program, self.vbo, self.ibo)
+
+    def in_frustum(self, frustum: Frustum) -> bool:
+        """ Whether the chunk is (possibly) visible in the frustum. """
+
+        if not frustum.intersects_sphere(self.bounds.center, self.bounds.radius): return False
+        return frustum.intersects_aabb(self.bounds.minimum, self.bounds.maximum)
+
+    def render(self):
+        """ Render chunk, vertices are already in world space. """
+
+        self.uniforms.set("u_model", glm.mat4())
+        self.uniforms.set("u_normal_matrix", glm.mat3())
+
+        if self.program_name in ("flat", "unlitflat"):
+            self.uniforms.set("u_color", self.color)
+
+        if self.texture is not None: self.texture.use(0)
+
+        if self.wireframe: self.vao.render(moderngl.LINES, vertices=self.draw_count)
+        else: self.vao.render(vertices=self.draw_count)
+
+    def release(self):
+        """ Release GPU resources of the chunk. """
+
+        self.vao.release()
+        self.vbo.release()
+        self.ibo.release()
+
+        if self.texture is not None: self.texture.release()
+        self.texture = None
+
+
+class StaticGeometry:
+    """
+    Geometry of static entities baked into merged world space buffers.
+
+    Triangles of all static entities are transformed into world space and
+    grouped by shader program, texture and color, so each group can be drawn
+    with one call without per-entity uniforms. Groups are split into chunks
+    on a world space grid, so large meshes (and large groups) can still be
+    frustum culled piece by piece.
+
+    Baked entities are skipped when the scene is drawn but stay in the scene
+    for updates and queries. Moving them has no visible effect until the
+    geometry is built again.
+    """
+
+    def __init__(self, engine: "Engine", chunk_size: float = DEFAULT_CHUNK_SIZE):
+        self.engine = engine
+        self.chunk_size = chunk_size
+
+        self.chunks: list[StaticChunk] = []
+        self.entities: list["Entity"] = []
+
+        # Chunks drawn and culled in the last frame
+        self.drawn = 0
+        self.culled = 0
+
+    @staticmethod
+    def can_bake(entity: "Entity") -> bool:
+        """ Whether the entity's model can be baked. """
+
+        model = entity.model
+
+        if isinstance(model, InstancedModel): return False
+        if isinstance(model, MultiMaterialModel): return model.layer_buffer is None
+        return isinstance(model, BasicModel)
+
+    def build(self, entities: Iterable["Entity"]):
+        """
+        Bake static entities, replacing previously baked geometry.
+
+        @param entities Entities to bake, the ones that are not static or can't be baked are ignored
+        """
+
+        self.release()
+
+        # Parts of each group, world space vertex data and triangle corners
+        groups = {}
+
+        for entity in entities:
+            if not entity.static or not self.can_bake(entity): continue
+
+            model = entity.model
+            model_matrix = np.array(entity.model_matrix, dtype=np.float64)
+            normal_matrix = np.array(entity.normal_matrix, dtype=np.float64)
+
+            for mesh, texture in self.__model_parts(model):
+                key = (
+                    model.program_name,
+                    texture,
+                    tuple(glm.vec4(model.color)) if model.program_name in ("flat", "unlitflat") else None,
+                    model.wireframe
+                )
+                groups.setdefault(key, []).append(self.__transform(mesh, model_matrix, normal_matrix))
+
+            entity.baked = True
+            self.entities.append(entity)
+
+        for (program_name, texture, color, wireframe), parts in groups.items():
+            for mesh in self.__split(parts):
+                self.chunks.append(
+                    StaticChunk(
+                        self.engine,
+                        program_name,
+                        texture,
+                        glm.vec4(color) if color is not None else glm.vec4(1.0),
+                        wireframe,
+                        mesh
+                    )
+                )
+
+    def render(self, frustum: Optional[Frustum] = None):
+        """
+        Render chunks in the frustum.
+
+        @param frustum View frustum, all chunks are drawn if None
+        """
+
+        self.drawn = 0
+        self.culled = 0
+
+        for chunk in self.chunks:
+            if frustum is not None and not chunk.in_frustum(frustum):
+                self.culled += 1
+                continue
+
+            chunk.render()
+            self.drawn += 1
+
+    def release(self):
+        """ Release baked geometry, baked entities are drawn on their own again. """
+
+        for chunk in self.chunks: chunk.release()
+        for entity in self.entities: entity.baked = False
+
+        self.chunks = []
+        self.entities = []
+
+    def __model_parts(self, model: Model) -> list[tuple[ObjMesh, Optional[SharedTexture]]]:
+        # Full meshes are baked whatever LOD level the model is at
+        if isinstance(model, MultiMaterialModel): return list(zip(model.meshes, model.textures))
+        return [(model.meshes[0], model.texture)]
+
+    def __transform(self,
+            mesh: ObjMesh,
+            model_matrix: np.ndarray,
+            normal_matrix: np.ndarray
+            ) -> tuple[np.ndarray, np.ndarray]:
+        data = np.array(mesh.data, dtype=np.float32)
+
+        data[:, 0:3] = mesh.vertices @ model_matrix[:3, :3].T + model_matrix[:3, 3]
+
+        normals = mesh.normals @ normal_matrix.T
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        data[:, 3:6] = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0.0)
+
+        if mesh.indices is None: indices = np.arange(mesh.vertex_count, dtype=np.uint32)
+        else: indices = mesh.indices
+
+        return data, indices.reshape(-1, 3)
+
+    def __split(self, parts: list[tuple[np.ndarray, np.ndarray]]) -> list[ObjMesh]:
+        """ Merge parts of a group and split them into meshes by grid cell. """
+
+        data = []
+        triangles = []
+        base = 0
+        for part_data, part_triangles in parts:
+            data.append(part_data)
+            triangles.append(part_triangles.astype(np.int64) + base)
+            base += len(part_data)
+
+        data = np.concatenate(data)
+        triangles = np.concatenate(triangles)
+
+        # Cell of each triangle's centroid
+        centroids = data[triangles, 0:3].mean(axis=1)
+        cells = np.floor(centroids / self.chunk_size).astype(np.int64)
+        _, cell_ids = np.unique(cells, axis=0, return_inverse=True)
+        cell_ids = cell_ids.reshape(-1)
+
+        meshes = []
+        for cell in range(cell_ids.max() + 1):
+            corners = triangles[cell_ids == cell].reshape(-1)
+            used, indices = np.unique(corners, return_inverse=True)
+
+            meshes.append(ObjMesh("", np.ascontiguousarray(data[used]), indices.reshape(-1).astype(np.uint32)))
+
+        return meshes
@@ -0,0 +1,189 @@
+"""
+
+    GoldSrc Python
+    MIT © Kadir Aksoy
+    https://github.com/kadir014/goldsrc-python
+
+"""
+
+from typing import Optional, Union
+
+from collections.abc import Sequence
+
+import glm
+import numpy as np
+
+
+class Bounds:
+    """
+    Bounding volumes of geometry in model space.
+
+    Axis-aligned bounding box and a bounding sphere centered in the box.
+    """
+
+    def __init__(self,
+            minimum: Union[tuple[float, float, float], glm.vec3, np.ndarray],
+            maximum: Union[tuple[float, float, float], glm.vec3, np.ndarray],
+            radius: Optional[float] = None
+            ):
+        self.minimum = glm.vec3(*minimum)
+        self.maximum = glm.vec3(*maximum)
+
+        self.center = (self.minimum + self.maximum) * 0.5
+        self.extents = (self.maximum - self.minimum) * 0.5
+
+        # Sphere enclosing the box unless a tighter radius is known
+        self.radius = glm.length(self.extents) if radius is None else radius
+
+    def __repr__(self) -> str:
+        return f"<Bounds({tuple(self.minimum)}, {tuple(self.maximum)}, radius={self.radius})>"
+
+    @classmethod
+    def from_points(cls, points: np.ndarray) -> "Bounds":
+        """
+        Bounds of points.
+
+        @param points Array of points in (N, 3) shape
+        @return Bounds, empty at the origin if there are no points
+        """
+
+        if len(points) == 0: return cls((0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+
+        minimum = points.min(axis=0)
+        maximum = points.max(axis=0)
+        center = (minimum + maximum) * 0.5
+
+        radius = float(np.sqrt(((points - center) ** 2).sum(axis=1).max()))
+
+        return cls(minimum, maximum, radius)
+
+    @classmethod
+    def union(cls, bounds: Sequence["Bounds"]) -> "Bounds":
+        """ Bounds enclosing all bounds. """
+
+        minimum = bounds[0].minimum
+        maximum = bounds[0].maximum
+        for other in bounds[1:]:
+            minimum = glm.min(minimum, other.minimum)
+            maximum = glm.max(maximum, other.maximum)
+
+        union = cls(minimum, maximum)
+        union.radius = min(
+            union.radius,
+            max(glm.distance(union.center, other.center) + other.radius for other in bounds)
+        )
+
+        return union
+
+    def sphere(self, matrix: glm.mat4) -> tuple[glm.vec3, float]:
+        """
+        Bounding sphere transformed by model matrix.
+
+        @param matrix Model matrix
+        @return Center and radius in world space
+        """
+
+        center = glm.vec3(matrix * glm.vec4(self.center, 1.0))
+
+        scale = max(
+            glm.length(glm.vec3(matrix[0])),
+            glm.length(glm.vec3(matrix[1])),
+            glm.length(glm.vec3(matrix[2]))
+        )
+
+        return center, self.radius * scale
+
+    def aabb(self, matrix: glm.mat4) -> tuple[glm.vec3, glm.vec3]:
+        """
+        Axis-aligned box enclosing the bounding box transformed by model matrix.
+
+        @param matrix Model matrix
+        @return Minimum and maximum corners in world space
+        """
+
+        center = glm.vec3(matrix * glm.vec4(self.center, 1.0))
+
+        extents = glm.abs(glm.vec3(matrix[0])) * self.extents.x + \
+                  glm.abs(glm.vec3(matrix[1])) * self.extents.y + \
+                  glm.abs(glm.vec3(matrix[2])) * self.extents.z
+
+        return center - extents, center + extents
+
+
+class Frustum:
+    """
+    View frustum as six planes extracted from a projection * view matrix.
+
+    Planes are (normal, distance) with normals pointing inside, in left,
+    right, bottom, top, near, far order.
+    """
+
+    # Box classifications
+    OUTSIDE = 0
+    INTERSECTING = 1
+    INSIDE = 2
+
+    def __init__(self, matrix: glm.mat4):
+        rows = [glm.row(matrix, i) for i in range(4)]
+
+        self.planes = []
+        for i in range(3):
+            for sign in (1.0, -1.0):
+                plane = rows[3] + rows[i] * sign
+                self.planes.append(plane / glm.length(glm.vec3(plane)))
+
+        # Plane coefficients as floats for box classification
+        self.__coefficients = [tuple(plane) for plane in self.planes]
+
+    def intersects_sphere(self, center: glm.vec3, radius: float) -> bool:
+        """ Whether the sphere is (at least partially) inside the frustum. """
+
+        for plane in self.planes:
+            if glm.dot(glm.vec3(plane), center) + plane.w < -radius: return False
+
+        return True
+
+    def intersects_aabb(self, minimum: glm.vec3, maximum: glm.vec3) -> bool:
+        """ Whether the axis-aligned box is (at least partially) inside the frustum. """
+
+        for plane in self.planes:
+            # Corner furthest along the plane normal
+            corner = glm.vec3(
+                maximum.x if plane.x >= 0.0 else minimum.x,
+                maximum.y if plane.y >= 0.0 else minimum.y,
+                maximum.z if plane.z >= 0.0 else minimum.z
+            )
+
+            if glm.dot(glm.vec3(plane), corner) + plane.w < 0.0: return False
+
+        return True
+
+    def classify_aabb(self, minimum: glm.vec3, maximum: glm.vec3) -> int:
+        """
+        Classify the axis-aligned box against the frustum.
+
+        @param minimum Minimum corner of the box
+        @param maximum Maximum corner of the box
+        @return OUTSIDE, INTERSECTING or INSIDE
+        """
+
+        min_x, min_y, min_z = minimum
+        max_x, max_y, max_z = maximum
+
+        result = Frustum.INSIDE
+
+        for a, b, c, d in self.__coefficients:
+            # Distances of the corners furthest along and against the plane normal
+            if a >= 0.0: positive, negative = a * max_x, a * min_x
+            else: positive, negative = a * min_x, a * max_x
+
+            if b >= 0.0: positive, negative = positive + b * max_y, negative + b * min_y
+            else: positive, negative = positive + b * min_y, negative + b * max_y
+
+            if c >= 0.0: positive, negative = positive + c * max_z, negative + c * min_z
+            else: positive, negative = positive + c * min_z, negative + c * max_z
+
+            if positive + d < 0.0: return Frustum.OUTSIDE
+            if negative + d < 0.0: result = Frustum.INTERSECTING
+
+        return result
@@ -12,6 +12,8 @@ from math import sin, cos, radians, pi
 
 import glm
 
+from .bounds import Frustum
+
 
 class Camera:
     """
@@ -65,6 +67,10 @@ class Camera:
             self.up
         )
 
+    def get_frustum(self) -> Frustum:
+        """ Get view frustum from projection and view matrices. """
+        return Frustum(self.projection * self.get_view_matrix())
+
     def update(self):
         """ Update vectors used to generate view matrix. """
         if self.pitch > pi / 2: self.pitch = pi / 2
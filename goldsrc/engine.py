@@ -17,6 +17,7 @@ import moderngl
 
 from .common import DISPLAY_RESOLUTIONS
 from .renderer import Renderer
+from .model import AnimationClock, ModelInstance
 from .input import InputManager
 from .scene import Scene
 from .hwinfo import get_cpu_info, get_gpu_info
@@ -35,6 +36,12 @@ class Engine:
         self.max_fps = 165
         self.fps = self.max_fps
         self.dt = 1.0 / self.fps
+        self.animation_clock = AnimationClock()
+
+        # Entities culled, occluded and drawn in the last frame
+        self.culled_entities = 0
+        self.occluded_entities = 0
+        self.drawn_entities = 0
         self.is_running = False
         self.counter = 0
 
@@ -65,6 +72,9 @@ class Engine:
         self.apply_postprocess = False
         self.show_debug_ui = False
 
+        # Skip entities that were hidden behind others in the last frame, see OcclusionCuller
+        self.occlusion_culling = False
+
         # Scenes
         self.scenes = {}
         self.__current_scene = None
@@ -222,6 +232,7 @@ class Engine:
         while self.is_running:
             self.dt = self.clock.tick(self.max_fps) / 1000
             self.fps = self.clock.get_fps()
+            self.animation_clock.tick(self.dt)
 
             with self.profile("frame"):
 
@@ -248,6 +259,12 @@ class Engine:
                     self.renderer.context.screen.use()
                     self.renderer.clear()
 
+                self.renderer.uniform_stats.new_frame()
+
+                # Camera and light data shared by all models
+                if self.scene.camera is not None and self.scene.light is not None:
+                    self.renderer.update_frame(self.scene.camera, self.scene.light)
+
                 # Update and render scene's active skybox
                 if self.scene.skybox is not None:
                     self.scene.skybox.update(self.scene.camera)
@@ -256,11 +273,65 @@ class Engine:
                         with self.renderer.no_depth_test():
                             self.scene.skybox.render()
 
-                # Update and render models
+                # Instanced models, drawn once after all of their instances are updated
+                instanced_models = {}
+
+                # Update entities and move the ones that left their boxes in the spatial index
                 for entity in self.scene.entities:
                     entity.update(self.scene.camera, self.scene.light)
 
-                    if entity.model is not None:
+                self.scene.spatial.update()
+
+                # Entities outside of the view frustum are not updated for rendering nor drawn
+                if self.scene.camera is None: frustum = None
+                else:
+                    frustum = self.scene.camera.get_frustum()
+                    visible = set(self.scene.spatial.query_frustum(frustum))
+
+                self.culled_entities = 0
+                self.occluded_entities = 0
+                self.drawn_entities = 0
+
+                # Baked static geometry, drawn first so it occludes entities
+                with self.profile("render"):
+                    self.scene.static_geometry.render(frustum)
+
+                # Occlusion query results of the last frame
+                occlusion_culling = self.occlusion_culling and frustum is not None
+                if occlusion_culling: self.renderer.occlusion.resolve()
+                else: self.renderer.occlusion.clear()
+
+                # Entities in the view frustum, hidden ones are queried again
+                occludees = []
+
+                # Render models in scene order
+                for entity in self.scene.entities:
+                    if entity.model is None or entity.baked: continue
+
+                    # Entities added to the list directly aren't in the spatial index
+                    if frustum is None: is_visible = True
+                    elif entity in self.scene.spatial: is_visible = entity in visible
+                    else: is_visible = entity.in_frustum(frustum)
+
+                    if not is_visible:
+                        self.culled_entities += 1
+                        continue
+
+                    if occlusion_culling:
+                        occludees.append(entity)
+
+                        if self.renderer.occlusion.is_hidden(entity):
+                            self.occluded_entities += 1
+                            continue
+
+                    entity.update_model(self.scene.camera, self.scene.light)
+                    self.drawn_entities += 1
+
+                    if isinstance(entity.model, ModelInstance):
+                        # Removed instances aren't drawn anymore
+                        if not entity.model.removed: instanced_models[entity.model.model] = None
+
+                    else:
                         with self.profile("render"):
                             if entity.model.program_name == "base":pass
                                 #model.program["s_skybox"] = 0
@@ -270,6 +341,15 @@ class Engine:
                             #    entity.model.program["s_normal"] = 1
                             entity.model.render()
 
+                for model in instanced_models:
+                    with self.profile("render"):
+                        model.render()
+
+                # Query occlusion against the depth buffer of the drawn entities
+                if occlusion_culling:
+                    with self.profile("render"):
+                        self.renderer.occlusion.query(occludees, self.scene.camera)
+
                 with self.profile("render"):
                     # Render scene
                     self.scene.render()
@@ -11,8 +11,7 @@ from typing import TYPE_CHECKING, Optional, Union
 import glm
 import moderngl
 
-from .math import flatten_mat
-
+from .bounds import Frustum
 from .collision import ColliderShape, SphereCollider, MeshCollider, sphere_x_sphere, sphere_x_mesh
 
 if TYPE_CHECKING:
@@ -32,7 +31,8 @@ class Entity:
             position: Union[tuple[float, float, float], glm.vec3] = (0.0, 0.0, 0.0),
             rotation: Union[tuple[float, float, float], glm.vec3] = (0.0, 0.0, 0.0),
             scale: Union[tuple[float, float, float], glm.vec3] = (1.0, 1.0, 1.0),
-            model: Optional["Model"] = None
+            model: Optional["Model"] = None,
+            static: bool = False
             ):
         self.engine = engine
         self.position = glm.vec3(position)
@@ -41,6 +41,64 @@ class Entity:
         self.model = model
         self.collider = None
 
+        # Static entities never move and are baked into the scene's static
+        # geometry when it's built, baked entities aren't drawn on their own.
+        # Moving a baked entity has no visible effect until the static
+        # geometry is built again, see Scene.build_static
+        self.static = static
+        self.baked = False
+
+        # Cached transform matrices and the position, rotation and scale
+        # they were built from
+        self.__transform = None
+        self.__model_matrix = glm.mat4()
+        self.__normal_matrix = glm.mat3()
+
+        # World space bounds of the model and the model matrix and bounds they're from
+        self.__world_bounds = None
+
+    @property
+    def model_matrix(self) -> glm.mat4:
+        """
+        Model matrix of the entity.
+
+        The matrix is only rebuilt when position, rotation or scale changed
+        since it was last built, the same matrix object is returned otherwise.
+        Changes are detected by value, so modifying components in place
+        (entity.position.x += 1) is picked up too.
+        """
+
+        self.update_transform()
+        return self.__model_matrix
+
+    @property
+    def normal_matrix(self) -> glm.mat3:
+        """ Normal matrix of the entity, rebuilt with the model matrix. """
+
+        self.update_transform()
+        return self.__normal_matrix
+
+    def update_transform(self):
+        """ Rebuild transform matrices if position, rotation or scale changed. """
+
+        if self.__transform == (self.position, self.rotation, self.scale): return
+
+        self.__transform = (glm.vec3(self.position), glm.vec3(self.rotation), glm.vec3(self.scale))
+
+        # Create rotation matrix from euler angles
+        rotation = glm.rotate(          self.rotation.x, glm.vec3(1.0, 0.0, 0.0))
+        rotation = glm.rotate(rotation, self.rotation.y, glm.vec3(0.0, 1.0, 0.0))
+        rotation = glm.rotate(rotation, self.rotation.z, glm.vec3(0.0, 0.0, 1.0))
+
+        # Create translation matrix
+        translation = glm.translate(self.position)
+
+        # Create scale matrix
+        scale = glm.scale(self.scale)
+
+        self.__model_matrix = translation * rotation * scale
+        self.__normal_matrix = glm.transpose(glm.inverse(glm.mat3(self.__model_matrix)))
+
     def set_collider(self, collider_shape: ColliderShape, **kwargs):
         if collider_shape == ColliderShape.SPHERE:
             self.collider = SphereCollider(self, kwargs["radius"])
@@ -60,22 +118,84 @@ class Entity:
         elif self.collider.shape == ColliderShape.SPHERE and other.collider.shape == ColliderShape.MESH:
             return sphere_x_mesh(self.collider, other.collider)
 
+    def world_bounds(self) -> Optional[tuple[glm.vec3, float, glm.vec3, glm.vec3]]:
+        """
+        Get world space bounds of the entity's model.
+
+        @return Bounding sphere center and radius and AABB corners, None if the model has no bounds
+        """
+
+        bounds = None if self.model is None else self.model.bounds
+        if bounds is None: return None
+
+        matrix = self.model_matrix
+
+        if self.__world_bounds is None or \
+            self.__world_bounds[0] is not matrix or self.__world_bounds[1] is not bounds:
+            self.__world_bounds = (matrix, bounds, *bounds.sphere(matrix), *bounds.aabb(matrix))
+
+        return self.__world_bounds[2:]
+
+    def aabb(self) -> Optional[tuple[glm.vec3, glm.vec3]]:
+        """
+        Get world space axis-aligned box enclosing the entity's model and sphere collider.
+
+        @return Minimum and maximum corners, None if neither has bounds
+        """
+
+        world_bounds = self.world_bounds()
+
+        if world_bounds is None: box = None
+        else: box = world_bounds[2:]
+
+        if isinstance(self.collider, SphereCollider):
+            extents = glm.vec3(self.collider.radius)
+            minimum = self.position - extents
+            maximum = self.position + extents
+
+            if box is None: box = (minimum, maximum)
+            else: box = (glm.min(box[0], minimum), glm.max(box[1], maximum))
+
+        return box
+
+    def in_frustum(self, frustum: Frustum) -> bool:
+        """
+        Whether the entity's model is (possibly) visible in the frustum.
+
+        The bounding sphere is tested first and the AABB only if the sphere
+        intersects. Models without bounds are always visible.
+        """
+
+        world_bounds = self.world_bounds()
+        if world_bounds is None: return True
+
+        center, radius, minimum, maximum = world_bounds
+
+        if not frustum.intersects_sphere(center, radius): return False
+        return frustum.intersects_aabb(minimum, maximum)
+
     def update(self, camera: "Camera", light: "BasicLight"):
-        if self.model is not None:
-            # Create rotation matrix from euler angles
-            rotation = glm.rotate(          self.rotation.x, glm.vec3(1.0, 0.0, 0.0))
-            rotation = glm.rotate(rotation, self.rotation.y, glm.vec3(0.0, 1.0, 0.0))
-            rotation = glm.rotate(rotation, self.rotation.z, glm.vec3(0.0, 0.0, 1.0))
+        """
+        Entity update callback.
 
-            # Create translation matrix
-            translation = glm.translate(self.position)
+        Called every frame, even if the entity is culled. The model is
+        updated separately with update_model only if it's visible.
+        """
+        pass
 
-            # Create scale matrix
-            scale = glm.scale(self.scale)
+    def update_model(self, camera: "Camera", light: "BasicLight"):
+        """ Update model of the entity for rendering. """
 
-            # Model, projection and view matrices
-            model = translation * rotation * scale
+        if self.model is not None:
+            # Projection and view matrices
             projection = camera.projection
             view = camera.get_view_matrix()
 
-            self.model.update(model, projection, view, camera, light)
\ No newline at end of file
+            self.model.update(
+                self.model_matrix,
+                projection,
+                view,
+                camera,
+                light,
+                self.normal_matrix
+            )
\ No newline at end of file
@@ -6,12 +6,16 @@
 
 """
 
+import numpy as np
+
+from .objparser import interleave
+
 
 def create_plane_mesh(
         size: float,
         scale_uv_coords: bool = False
-        ) -> tuple[list[float], list[float], list[float]]:
-    """ Create plane vertices, normals and UV coords. """
+        ) -> np.ndarray:
+    """ Create plane vertex data, interleaved vertices, normals and UV coords. """
 
     x = size / 2.0
     y = size / 2.0
@@ -22,7 +26,7 @@ def create_plane_mesh(
     ]
 
     normals = []
-    for _ in range(len(vertices)):
+    for _ in range(len(vertices) // 3):
         normals.append(0.0)
         normals.append(0.0)
         normals.append(-1.0)
@@ -34,14 +38,14 @@ def create_plane_mesh(
         size, size,  0.0,  size
     ]
 
-    return  (vertices, normals, uv_coords)
+    return interleave(vertices, normals, uv_coords)
 
 
 def create_cube_mesh(
         size: float,
         scale_uv_coords: bool = False
-        ) -> tuple[list[float], list[float], list[float]]:
-    """ Create cube vertices, normals and UV coords. """
+        ) -> np.ndarray:
+    """ Create cube vertex data, interleaved vertices, normals and UV coords. """
     
     vertices = [
          size, -size,  size,  -size, -size,  size,  -size, -size, -size,
@@ -107,4 +111,4 @@ def create_cube_mesh(
         s1,  s1,   0.0, s2
     ]
 
-    return (vertices, normals, uv)
\ No newline at end of file
+    return interleave(vertices, normals, uv)
\ No newline at end of file
@@ -0,0 +1,394 @@
+"""
+
+    GoldSrc Python
+    MIT © Kadir Aksoy
+    https://github.com/kadir014/goldsrc-python
+
+"""
+
+from typing import Optional, Union
+
+import heapq
+import struct
+import hashlib
+import argparse
+from math import inf
+from pathlib import Path
+
+import numpy as np
+
+from .objparser import Obj, ObjMesh, parse, unique_rows
+from . import meshcache
+
+
+# Increment when simplifier output changes, invalidates LOD files
+SIMPLIFIER_VERSION = 1
+
+# Triangle count of each LOD level relative to the full mesh
+DEFAULT_RATIOS = (0.5, 0.25, 0.125)
+
+# Screen sizes (fraction of the viewport height covered by the bounding
+# sphere) below which each LOD level is used
+DEFAULT_SCREEN_SIZES = (0.3, 0.15, 0.075)
+
+# Screen size has to cross a threshold by this fraction to switch level
+DEFAULT_HYSTERESIS = 0.15
+
+# Weight of the quadrics keeping open borders in place
+BORDER_WEIGHT = 100.0
+
+# Weight of UV coordinate differences over normal differences when picking
+# replacement attribute rows
+UV_WEIGHT = 10.0
+
+# Collapses turning a triangle's normal further than this (cosine) are rejected
+MIN_NORMAL_DOT = 0.2
+
+
+def lod_path(filepath: Union[Path, str], level: int) -> Path:
+    """ Get the path of the LOD file of level next to the source file. """
+    filepath = Path(filepath)
+    return filepath.with_name(f"{filepath.name}.lod{level}{meshcache.EXTENSION}")
+
+
+def lod_key(source_key: bytes, level: int) -> bytes:
+    """ Hash source key (see meshcache.source_key) together with the LOD level and simplifier version. """
+
+    hasher = hashlib.sha256(source_key)
+    hasher.update(struct.pack("<II", level, SIMPLIFIER_VERSION))
+    return hasher.digest()
+
+
+def _plane_quadrics(planes: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """ Weighted outer products of (a, b, c, d) planes. """
+    return np.einsum("ni,nj->nij", planes, planes) * weights[:, None, None]
+
+
+def simplify(mesh: ObjMesh, target: int, max_error: float = inf) -> ObjMesh:
+    """
+    Simplify mesh to target triangle count with quadric error edge collapses.
+
+    Vertices are welded by position for collapsing, so vertices on UV and
+    normal seams move together. A vertex is collapsed onto one end of the
+    edge, its attribute rows are replaced by the closest rows of the kept
+    vertex, so no new vertices are created. Open borders are weighted to
+    stay in place and collapses that flip triangles are rejected.
+
+    @param mesh Mesh to simplify
+    @param target Triangle count to stop at
+    @param max_error Quadric error to stop at
+    @return Simplified indexed mesh
+    """
+
+    if mesh.indices is None: corners = np.arange(mesh.vertex_count, dtype=np.uint32)
+    else: corners = mesh.indices
+
+    rows = corners.reshape(-1, 3).astype(np.int64)
+    if len(rows) <= target: return mesh
+
+    positions, row_positions = np.unique(
+        mesh.vertices.astype(np.float64),
+        axis=0,
+        return_inverse=True
+    )
+    row_positions = row_positions.reshape(-1)
+    triangles = row_positions[rows]
+
+    # Attributes compared when picking replacement rows, UV coordinates first
+    normals = mesh.data[:, 3:6].astype(np.float64)
+    uv_coords = mesh.data[:, 6:8].astype(np.float64)
+    attributes = np.hstack((normals, uv_coords * UV_WEIGHT))
+
+    # Flat shaded meshes get their face normals recomputed after simplifying
+    corner_normals = normals[rows]
+    flat = bool(np.allclose(corner_normals, corner_normals[:, :1], atol=1e-4))
+
+    # Face quadrics, weighted by area
+    p0, p1, p2 = (positions[triangles[:, i]] for i in range(3))
+    face_normals = np.cross(p1 - p0, p2 - p0)
+    areas = np.linalg.norm(face_normals, axis=1)
+    valid = areas > 0.0
+    face_normals[valid] /= areas[valid, None]
+    planes = np.hstack((face_normals, -np.einsum("ij,ij->i", face_normals, p0)[:, None]))
+    face_quadrics = _plane_quadrics(planes, areas * 0.5)
+
+    quadrics = np.zeros((len(positions), 4, 4))
+    for i in range(3): np.add.at(quadrics, triangles[:, i], face_quadrics)
+
+    # Border quadrics, planes through border edges perpendicular to their face
+    edges = np.concatenate((triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]))
+    edge_faces = np.tile(np.arange(len(triangles)), 3)
+    sorted_edges = np.sort(edges, axis=1)
+    _, edge_ids, edge_counts = np.unique(sorted_edges, axis=0, return_inverse=True, return_counts=True)
+    border = edge_counts[edge_ids.reshape(-1)] == 1
+
+    if border.any():
+        a = positions[edges[border, 0]]
+        b = positions[edges[border, 1]]
+        direction = b - a
+        lengths = np.linalg.norm(direction, axis=1)
+        border_normals = np.cross(direction, face_normals[edge_faces[border]])
+        border_lengths = np.linalg.norm(border_normals, axis=1)
+        ok = border_lengths > 0.0
+        border_normals = border_normals[ok] / border_lengths[ok, None]
+        border_planes = np.hstack((border_normals, -np.einsum("ij,ij->i", border_normals, a[ok])[:, None]))
+        border_quadrics = _plane_quadrics(border_planes, lengths[ok] ** 2 * BORDER_WEIGHT)
+        np.add.at(quadrics, edges[border, 0][ok], border_quadrics)
+        np.add.at(quadrics, edges[border, 1][ok], border_quadrics)
+
+    # Connectivity
+    triangles = triangles.tolist()
+    rows = rows.tolist()
+    vertex_triangles = [set() for _ in range(len(positions))]
+    for t, triangle in enumerate(triangles):
+        for vertex in triangle: vertex_triangles[vertex].add(t)
+
+    vertex_rows = [[] for _ in range(len(positions))]
+    for row, vertex in enumerate(row_positions.tolist()): vertex_rows[vertex].append(row)
+
+    alive = [True] * len(triangles)
+    alive_count = len(triangles)
+    versions = [0] * len(positions)
+
+    def neighbors(vertex: int) -> set[int]:
+        result = set()
+        for t in vertex_triangles[vertex]: result.update(triangles[t])
+        result.discard(vertex)
+        return result
+
+    def error(quadric: np.ndarray, vertex: int) -> float:
+        point = np.append(positions[vertex], 1.0)
+        return float(point @ quadric @ point)
+
+    def push(u: int, v: int):
+        quadric = quadrics[u] + quadrics[v]
+        for source, destination in ((u, v), (v, u)):
+            heapq.heappush(heap, (error(quadric, destination), source, destination, versions[source], versions[destination]))
+
+    def replacement_rows(u: int, v: int) -> Optional[dict[int, int]]:
+        # Each row of u is replaced by the closest row of v, rows on different
+        # sides of a UV seam must stay on different sides
+        candidates = vertex_rows[v]
+        mapping = {}
+        for row in vertex_rows[u]:
+            distances = np.linalg.norm(attributes[candidates] - attributes[row], axis=1)
+            mapping[row] = candidates[int(np.argmin(distances))]
+
+        uvs = {}
+        for row, target_row in mapping.items():
+            uv = tuple(uv_coords[row])
+            target_uv = tuple(uv_coords[target_row])
+            if uvs.setdefault(uv, target_uv) != target_uv: return None
+
+        if len(set(uvs.values())) < len(uvs): return None
+        return mapping
+
+    def flips(u: int, v: int) -> bool:
+        for t in vertex_triangles[u]:
+            triangle = triangles[t]
+            if v in triangle: continue
+
+            before = [positions[vertex] for vertex in triangle]
+            after = [positions[v] if vertex == u else positions[vertex] for vertex in triangle]
+
+            n0 = np.cross(before[1] - before[0], before[2] - before[0])
+            n1 = np.cross(after[1] - after[0], after[2] - after[0])
+
+            l0 = np.linalg.norm(n0)
+            l1 = np.linalg.norm(n1)
+            if l1 == 0.0: return True
+            if l0 > 0.0 and np.dot(n0, n1) < MIN_NORMAL_DOT * l0 * l1: return True
+
+        return False
+
+    heap = []
+    for a, b in np.unique(sorted_edges, axis=0).tolist(): push(a, b)
+
+    while heap and alive_count > target:
+        cost, u, v, version_u, version_v = heapq.heappop(heap)
+        if cost > max_error: break
+        if versions[u] != version_u or versions[v] != version_v: continue
+
+        shared = vertex_triangles[u] & vertex_triangles[v]
+        if len(shared) == 0: continue
+
+        # Link condition, collapsing must not join the surface into non-manifold edges
+        if len(neighbors(u) & neighbors(v)) > len(shared): continue
+
+        if flips(u, v): continue
+
+        mapping = replacement_rows(u, v)
+        if mapping is None: continue
+
+        # Triangles on the edge disappear
+        for t in shared:
+            alive[t] = False
+            alive_count -= 1
+            for vertex in triangles[t]: vertex_triangles[vertex].discard(t)
+
+        # The rest of u's triangles move to v
+        for t in vertex_triangles[u]:
+            triangle = triangles[t]
+            corner = triangle.index(u)
+            triangle[corner] = v
+            rows[t][corner] = mapping[rows[t][corner]]
+            vertex_triangles[v].add(t)
+
+        vertex_triangles[u] = set()
+        vertex_rows[u] = []
+        quadrics[v] += quadrics[u]
+        versions[u] += 1
+        versions[v] += 1
+
+        for neighbor in neighbors(v): push(v, neighbor)
+
+    remaining = np.array([rows[t] for t in range(len(triangles)) if alive[t]], dtype=np.int64)
+
+    if flat:
+        data = mesh.data[remaining.reshape(-1)].reshape(-1, 3, mesh.data.shape[1]).copy()
+
+        face_normals = np.cross(data[:, 1, 0:3] - data[:, 0, 0:3], data[:, 2, 0:3] - data[:, 0, 0:3])
+        lengths = np.linalg.norm(face_normals, axis=1)
+        face_normals[lengths > 0.0] /= lengths[lengths > 0.0, None]
+        data[:, :, 3:6] = face_normals[:, None, :]
+
+        data = data.reshape(-1, mesh.data.shape[1])
+        first, indices = unique_rows(data)
+        return ObjMesh(mesh.material, np.ascontiguousarray(data[first]), indices)
+
+    # Compact rows used by the remaining triangles
+    used, indices = np.unique(remaining.reshape(-1), return_inverse=True)
+
+    return ObjMesh(
+        mesh.material,
+        np.ascontiguousarray(mesh.data[used]),
+        indices.reshape(-1).astype(np.uint32)
+    )
+
+
+def build(
+        filepath: Union[Path, str],
+        ratios: tuple[float, ...] = DEFAULT_RATIOS,
+        use_cache: bool = True
+        ) -> list[Obj]:
+    """
+    Build LOD chain of OBJ file and write it next to the file.
+
+    Every level is simplified from the previous one and stored as a cooked
+    mesh file keyed to the source content, so editing the source makes the
+    LOD files stale. Failing to write them is not an error.
+
+    @param filepath Path to the OBJ file
+    @param ratios Triangle count of each level relative to the full mesh
+    @param use_cache Write the LOD files
+    @return LOD levels, without the full mesh
+    """
+
+    obj = parse(filepath)
+    triangles = [mesh.draw_count // 3 for mesh in obj.meshes]
+
+    key = meshcache.source_key(filepath) if use_cache else None
+
+    levels = []
+    previous = obj
+    for level, ratio in enumerate(ratios, start=1):
+        meshes = []
+        for mesh, count in zip(previous.meshes, triangles):
+            meshes.append(simplify(mesh, max(1, int(count * ratio))))
+
+        previous = Obj(obj.name, meshes, obj.smooth_shading, obj.material)
+        levels.append(previous)
+
+        if use_cache:
+            try: meshcache.cook(previous, lod_key(key, level), lod_path(filepath, level))
+            except OSError: pass
+
+    return levels
+
+
+def load(
+        filepath: Union[Path, str],
+        ratios: tuple[float, ...] = DEFAULT_RATIOS,
+        use_cache: bool = True
+        ) -> list[Obj]:
+    """
+    Load LOD chain of OBJ file, building it if it's missing or stale.
+
+    Existing LOD files are used as they are, whatever ratios they were
+    built with.
+
+    @param filepath Path to the OBJ file
+    @param ratios Triangle count of each level when the chain is built
+    @param use_cache Use and update the LOD files
+    @return LOD levels, without the full mesh
+    """
+
+    if not use_cache: return build(filepath, ratios, False)
+
+    key = meshcache.source_key(filepath)
+
+    levels = []
+    level = 1
+    while True:
+        obj = meshcache.load_cooked(lod_path(filepath, level), lod_key(key, level))
+        if obj is None: break
+
+        levels.append(obj)
+        level += 1
+
+    if len(levels) == 0: return build(filepath, ratios)
+    return levels
+
+
+def screen_size(radius: float, distance: float, projection_scale: float) -> float:
+    """
+    Fraction of the viewport height covered by a bounding sphere.
+
+    @param radius Radius of the sphere
+    @param distance Distance from the camera to the center of the sphere
+    @param projection_scale Vertical scale of the projection matrix (projection[1][1])
+    @return Screen size, infinite if the camera is inside the sphere
+    """
+
+    if distance <= radius: return inf
+    return radius * projection_scale / distance
+
+
+def select_level(
+        size: float,
+        current: int,
+        screen_sizes: tuple[float, ...] = DEFAULT_SCREEN_SIZES,
+        hysteresis: float = DEFAULT_HYSTERESIS
+        ) -> int:
+    """
+    Select LOD level from screen size.
+
+    Level changes only when the size is past the threshold by the
+    hysteresis fraction, so objects around a threshold don't pop between
+    levels every frame.
+
+    @param size Screen size of the object
+    @param current Current LOD level
+    @param screen_sizes Screen size below which each level (starting from 1) is used
+    @param hysteresis Fraction the size has to cross a threshold by
+    @return New LOD level
+    """
+
+    level = min(current, len(screen_sizes))
+
+    while level < len(screen_sizes) and size < screen_sizes[level] * (1.0 - hysteresis): level += 1
+    while level > 0 and size > screen_sizes[level - 1] * (1.0 + hysteresis): level -= 1
+
+    return level
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build LOD chains of OBJ files.")
+    parser.add_argument("files", nargs="+", type=Path, help="OBJ files")
+    parser.add_argument("--ratios", nargs="+", type=float, default=DEFAULT_RATIOS, help="triangle ratio of each level")
+    args = parser.parse_args()
+
+    for filepath in args.files:
+        levels = build(filepath, tuple(args.ratios))
+        counts = [sum(mesh.draw_count // 3 for mesh in level.meshes) for level in levels]
+        print(f"{filepath}: {' -> '.join(str(count) for count in counts)} triangles")
@@ -9,6 +9,7 @@
 from typing import Union, overload
 
 from math import sqrt
+from itertools import chain
 
 import glm
 
@@ -30,12 +31,12 @@ def flatten_mat(
         ]
         ) -> tuple:
     """ Flatten any GLM matrix into 1D tuple. """
-    return tuple(sum(matrix.to_tuple(), ()))
+    return tuple(chain.from_iterable(matrix.to_tuple()))
 
 
 def flatten_2dlist(list2d: list) -> list:
-    """ Flatten 2D list into 1D tuple. """
-    return sum(list2d, [])
+    """ Flatten 2D list into 1D list. """
+    return list(chain.from_iterable(list2d))
 
 
 class Vector3:
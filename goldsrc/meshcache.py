@@ -0,0 +1,316 @@
+"""
+
+    GoldSrc Python
+    MIT © Kadir Aksoy
+    https://github.com/kadir014/goldsrc-python
+
+"""
+
+from typing import Optional, Union
+
+import os
+import mmap
+import struct
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from .objparser import PARSER_VERSION, VERTEX_SIZE, Obj, ObjMesh, parse
+
+
+# Cooked mesh file layout
+#
+#   Header
+#   Attribute layout table    (one entry per attribute, indices included)
+#   Material range table      (one entry per mesh)
+#   Object name & material library strings
+#   Attribute data            (each attribute is one contiguous array,
+#                              16 byte aligned, vertex data is interleaved)
+#
+# Indices of each mesh are local to the mesh's own vertex range.
+#
+# All values are little-endian.
+
+MAGIC = b"GSMC"
+FORMAT_VERSION = 3
+EXTENSION = ".cooked"
+
+# magic, format version, flags, key, attribute count, mesh count
+HEADER = struct.Struct("<4sHH32sII")
+
+# name, NumPy dtype, component count, element count, data offset
+ATTRIBUTE = struct.Struct("<16s4sIQQ")
+
+# name length, first vertex, vertex count, first index, index count
+RANGE = struct.Struct("<HIIII")
+
+# string length
+STRING = struct.Struct("<H")
+
+FLAG_SMOOTH_SHADING = 1 << 0
+
+# Source files are hashed in chunks of this size, so they are never read whole
+HASH_CHUNK_SIZE = 1 << 20
+
+# Attributes in the order they are stored in, with their dtypes and component counts
+ATTRIBUTES = (
+    ("data", "<f4", VERTEX_SIZE),
+    ("indices", "<u4", 1)
+)
+
+
+def cache_path(filepath: Union[Path, str]) -> Path:
+    """ Get the path of the cooked mesh file next to the source file. """
+    filepath = Path(filepath)
+    return filepath.with_name(filepath.name + EXTENSION)
+
+
+def source_key(filepath: Union[Path, str]) -> bytes:
+    """ Hash source file content together with the parser and format versions. """
+
+    hasher = hashlib.sha256()
+
+    with open(filepath, "rb") as source_file:
+        for chunk in iter(lambda: source_file.read(HASH_CHUNK_SIZE), b""): hasher.update(chunk)
+
+    hasher.update(struct.pack("<II", PARSER_VERSION, FORMAT_VERSION))
+    return hasher.digest()
+
+
+def _pack_string(string: str) -> bytes:
+    data = string.encode("utf-8")
+    return STRING.pack(len(data)) + data
+
+
+def _unpack_string(buffer: mmap.mmap, offset: int) -> tuple[str, int]:
+    length, = STRING.unpack_from(buffer, offset)
+    offset += STRING.size
+    return str(buffer[offset:offset + length], "utf-8"), offset + length
+
+
+def _align(offset: int) -> int:
+    return (offset + 15) & ~15
+
+
+def cook(obj: Obj, key: bytes, out_path: Union[Path, str]):
+    """
+    Write parsed OBJ model into cooked mesh file.
+
+    The file is written to a temporary path first and then moved in place, so
+    readers never see a partially written file.
+
+    @param obj Parsed OBJ model
+    @param key Source key the cooked file is valid for
+    @param out_path Output file path
+    """
+
+    out_path = Path(out_path)
+
+    # Non-indexed meshes are stored with sequential indices
+    indices = []
+    for mesh in obj.meshes:
+        if mesh.indices is None:
+            indices.append(np.arange(mesh.vertex_count, dtype=np.uint32))
+        else:
+            indices.append(mesh.indices)
+
+    tables = b""
+    first = 0
+    first_index = 0
+    for mesh, mesh_indices in zip(obj.meshes, indices):
+        name = mesh.material.encode("utf-8")
+        tables += RANGE.pack(
+            len(name),
+            first,
+            mesh.vertex_count,
+            first_index,
+            len(mesh_indices)
+        ) + name
+        first += mesh.vertex_count
+        first_index += len(mesh_indices)
+
+    tables += _pack_string(obj.name) + _pack_string(obj.material)
+
+    # Lay attribute arrays out after the tables
+    arrays = []
+    offset = HEADER.size + ATTRIBUTE.size * len(ATTRIBUTES) + len(tables)
+    layout = b""
+    for attribute, dtype, components in ATTRIBUTES:
+        offset = _align(offset)
+
+        if attribute == "indices":
+            parts = indices
+        else:
+            parts = [getattr(mesh, attribute) for mesh in obj.meshes]
+
+        if len(parts) > 0:
+            array = np.ascontiguousarray(np.concatenate(parts), dtype=dtype)
+        else:
+            array = np.zeros(0, dtype=dtype)
+
+        layout += ATTRIBUTE.pack(
+            attribute.encode("ascii"),
+            dtype.encode("ascii"),
+            components,
+            array.size // components,
+            offset
+        )
+        arrays.append((offset, array))
+        offset += array.nbytes
+
+    flags = FLAG_SMOOTH_SHADING if obj.smooth_shading else 0
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        flags,
+        key,
+        len(ATTRIBUTES),
+        len(obj.meshes)
+    )
+
+    temp_path = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+
+    try:
+        with open(temp_path, "wb") as out:
+            out.write(header + layout + tables)
+
+            for offset, array in arrays:
+                out.write(b"\0" * (offset - out.tell()))
+                out.write(array.tobytes())
+
+        os.replace(temp_path, out_path)
+
+    except OSError:
+        # Don't leave partially written files in the asset directory
+        try: os.unlink(temp_path)
+        except OSError: pass
+        raise
+
+
+def load_cooked(filepath: Union[Path, str], key: Optional[bytes] = None) -> Optional[Obj]:
+    """
+    Load cooked mesh file with memory mapping.
+
+    Mesh attributes are NumPy views into the mapped file, so they can be
+    passed to buffer creation without copying them into Python memory first.
+
+    @param filepath Path to the cooked mesh file
+    @param key Expected source key, cooked file is treated as stale if it doesn't match
+    @return Cooked OBJ model, or None if the file is missing, stale or invalid
+    """
+
+    try:
+        with open(filepath, "rb") as cooked_file:
+            buffer = mmap.mmap(cooked_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    except (OSError, ValueError):
+        return None
+
+    # Truncated or corrupt files are rebuilt like stale ones
+    try: return _read_cooked(buffer, key)
+    except (struct.error, ValueError, KeyError): return None
+
+
+def _read_cooked(buffer: mmap.mmap, key: Optional[bytes]) -> Optional[Obj]:
+    if len(buffer) < HEADER.size:
+        return None
+
+    magic, version, flags, file_key, attribute_count, mesh_count = \
+        HEADER.unpack_from(buffer, 0)
+
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+
+    if key is not None and file_key != key:
+        return None
+
+    offset = HEADER.size
+
+    # Attribute layout
+    attributes = {}
+    for _ in range(attribute_count):
+        name, dtype, components, count, data_offset = \
+            ATTRIBUTE.unpack_from(buffer, offset)
+        offset += ATTRIBUTE.size
+
+        name = name.rstrip(b"\0").decode("ascii")
+        dtype = dtype.rstrip(b"\0").decode("ascii")
+
+        # Only the layouts this format writes are accepted
+        if (name, dtype, components) not in ATTRIBUTES:
+            raise ValueError(f"unknown attribute layout {name} {dtype} {components}")
+
+        dtype = np.dtype(dtype)
+        if data_offset + count * components * dtype.itemsize > len(buffer):
+            raise ValueError("attribute data is out of bounds")
+
+        array = np.frombuffer(
+            buffer,
+            dtype=dtype,
+            count=count * components,
+            offset=data_offset
+        )
+
+        if components > 1: array = array.reshape(count, components)
+
+        attributes[name] = array
+
+    # Material ranges
+    ranges = []
+    for _ in range(mesh_count):
+        length, *mesh_range = RANGE.unpack_from(buffer, offset)
+        offset += RANGE.size
+        ranges.append((str(buffer[offset:offset + length], "utf-8"), *mesh_range))
+        offset += length
+
+    name, offset = _unpack_string(buffer, offset)
+    material, offset = _unpack_string(buffer, offset)
+
+    data = attributes["data"]
+    indices = attributes["indices"]
+
+    meshes = []
+    for material_name, first, count, first_index, index_count in ranges:
+        if first + count > len(data) or first_index + index_count > len(indices):
+            raise ValueError("mesh range is out of bounds")
+
+        meshes.append(
+            ObjMesh(
+                material_name,
+                data[first:first + count],
+                indices[first_index:first_index + index_count]
+            )
+        )
+
+    return Obj(name, meshes, bool(flags & FLAG_SMOOTH_SHADING), material)
+
+
+def load(filepath: Union[Path, str], use_cache: bool = True) -> Obj:
+    """
+    Load Wavefront OBJ file through the cooked mesh cache.
+
+    If the cooked file next to the source is missing or stale, the source is
+    parsed and the cooked file is (re)built. Failing to write the cooked file
+    (read-only asset directory etc.) is not an error.
+
+    @param filepath Path to the OBJ file
+    @param use_cache Use and update the cooked mesh file
+    @return Parsed OBJ model
+    """
+
+    if not use_cache:
+        return parse(filepath)
+
+    key = source_key(filepath)
+    path = cache_path(filepath)
+
+    obj = load_cooked(path, key)
+    if obj is not None: return obj
+
+    obj = parse(filepath)
+
+    try: cook(obj, key, path)
+    except OSError: pass
+
+    return obj
@@ -0,0 +1,204 @@
+"""
+
+    GoldSrc Python
+    MIT © Kadir Aksoy
+    https://github.com/kadir014/goldsrc-python
+
+"""
+
+from typing import Optional, Union, TYPE_CHECKING
+
+from collections.abc import Hashable
+from pathlib import Path
+
+import moderngl
+
+from .objparser import ObjMesh, merge_meshes
+from .bounds import Bounds
+from .factory import create_plane_mesh, create_cube_mesh
+from . import meshcache
+from . import lod
+
+if TYPE_CHECKING:
+    from .renderer import Renderer
+
+
+class SharedMesh:
+    """
+    Mesh geometry uploaded to the GPU and shared by models.
+
+    All meshes are merged into one vertex buffer (and index buffer if they
+    are indexed). VAOs are created once per shader program. Models acquire
+    a reference to the shared mesh and release it when they're done, GPU
+    memory is freed when the last reference is released.
+    """
+
+    def __init__(self,
+            registry: "MeshRegistry",
+            key: Optional[Hashable],
+            meshes: list[ObjMesh]
+            ):
+        self.registry = registry
+        self.key = key
+        self.meshes = meshes
+        self.references = 0
+
+        # Model space bounds of each mesh
+        self.bounds = [Bounds.from_points(mesh.vertices) for mesh in meshes]
+
+        merged = merge_meshes(meshes)
+
+        self.vbo = self.registry.renderer.create_bo(merged.data)
+
+        if merged.indices is None: self.ibo = None
+        else: self.ibo = self.registry.renderer.create_bo(merged.indices)
+
+        self.__vaos = {}
+
+    @property
+    def nbytes(self) -> int:
+        """ GPU memory used by the buffers in bytes. """
+        if self.ibo is None: return self.vbo.size
+        return self.vbo.size + self.ibo.size
+
+    def vao(self, program: moderngl.Program) -> moderngl.VertexArray:
+        """ Get VAO of the mesh for the shader program. """
+
+        vao = self.__vaos.get(program.glo)
+
+        if vao is None:
+            vao = self.registry.renderer.create_vao(program, self.vbo, self.ibo)
+            self.__vaos[program.glo] = vao
+
+        return vao
+
+    def acquire(self) -> "SharedMesh":
+        """ Acquire a reference. """
+        self.references += 1
+        return self
+
+    def release(self):
+        """ Release a reference, GPU resources are released with the last one. """
+
+        self.references -= 1
+        if self.references > 0: return
+
+        for vao in self.__vaos.values(): vao.release()
+        self.__vaos.clear()
+
+        self.vbo.release()
+        if self.ibo is not None: self.ibo.release()
+
+        self.registry.forget(self)
+
+
+class MeshRegistry:
+    """
+    Registry of shared meshes keyed by their source and load options.
+
+    Loading the same source again hands out a new reference to the already
+    uploaded mesh instead of parsing and uploading it again.
+    """
+
+    def __init__(self, renderer: "Renderer"):
+        self.renderer = renderer
+
+        self.__meshes = {}
+
+    def __len__(self) -> int:
+        return len(self.__meshes)
+
+    @property
+    def nbytes(self) -> int:
+        """ GPU memory used by registered meshes in bytes. """
+        return sum(mesh.nbytes for mesh in self.__meshes.values())
+
+    def get(self, key: Hashable) -> Optional[SharedMesh]:
+        """ Get a new reference to registered mesh, None if it isn't registered. """
+
+        mesh = self.__meshes.get(key)
+        if mesh is None: return None
+        return mesh.acquire()
+
+    def add(self, meshes: list[ObjMesh], key: Optional[Hashable] = None) -> SharedMesh:
+        """
+        Upload meshes and get a reference to them.
+
+        @param meshes Meshes to upload
+        @param key Registry key, mesh is not shared if None
+        @return Shared mesh
+        """
+
+        mesh = SharedMesh(self, key, meshes)
+        if key is not None: self.__meshes[key] = mesh
+
+        return mesh.acquire()
+
+    def forget(self, mesh: SharedMesh):
+        """ Remove released mesh from the registry. """
+        if self.__meshes.get(mesh.key) is mesh: del self.__meshes[mesh.key]
+
+    def load_obj(self, filepath: Union[Path, str], use_cache: bool = True) -> SharedMesh:
+        """
+        Get a reference to the mesh of OBJ file, loading it if needed.
+
+        @param filepath Path to the OBJ file
+        @param use_cache Use the cooked mesh cache when loading
+        @return Shared mesh
+        """
+
+        key = ("obj", str(Path(filepath).resolve()))
+
+        mesh = self.get(key)
+        if mesh is not None: return mesh
+
+        return self.add(meshcache.load(filepath, use_cache).meshes, key)
+
+    def load_obj_lods(self, filepath: Union[Path, str], use_cache: bool = True) -> list[SharedMesh]:
+        """
+        Get references to the LOD levels of OBJ file, loading them if needed.
+
+        LOD files next to the OBJ file are built if they're missing or stale.
+
+        @param filepath Path to the OBJ file
+        @param use_cache Use and update the LOD files
+        @return Shared meshes of LOD levels, without the full mesh
+        """
+
+        source = str(Path(filepath).resolve())
+
+        meshes = []
+        level = 1
+        while True:
+            mesh = self.get(("lod", source, level))
+            if mesh is None: break
+
+            meshes.append(mesh)
+            level += 1
+
+        if len(meshes) > 0: return meshes
+
+        return [
+            self.add(obj.meshes, ("lod", source, level))
+            for level, obj in enumerate(lod.load(filepath, use_cache=use_cache), start=1)
+        ]
+
+    def load_plane(self, size: float, scale_uv_coords: bool = False) -> SharedMesh:
+        """ Get a reference to plane geometry, creating it if needed. """
+
+        key = ("plane", size, scale_uv_coords)
+
+        mesh = self.get(key)
+        if mesh is not None: return mesh
+
+        return self.add([ObjMesh("", create_plane_mesh(size, scale_uv_coords))], key)
+
+    def load_cube(self, size: float, scale_uv_coords: bool = False) -> SharedMesh:
+        """ Get a reference to cube geometry, creating it if needed. """
+
+        key = ("cube", size, scale_uv_coords)
+
+        mesh = self.get(key)
+        if mesh is not None: return mesh
+
+        return self.add([ObjMesh("", create_cube_mesh(size, scale_uv_coords))], key)
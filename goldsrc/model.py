@@ -9,15 +9,17 @@
 from typing import Optional, Union, TYPE_CHECKING
 
 from pathlib import Path
-from time import time
 
-import pygame
 import moderngl
 import glm
+import numpy as np
 
-from .math import flatten_mat
-from .factory import create_plane_mesh, create_cube_mesh
-from .objparser import parse, parse_animation, ObjAnimation, ObjMesh
+from .renderer import INSTANCE_LAYOUT
+from .objparser import parse_animation, merge_meshes, ObjAnimation, ObjMesh
+from .meshregistry import SharedMesh
+from .texturecache import SharedTexture
+from .bounds import Bounds
+from . import lod
 
 if TYPE_CHECKING:
     from .engine import Engine
@@ -32,6 +34,9 @@ class Model:
     color argument is only used when flat or unlitflat shaders are used.
     """
 
+    # Whether the model can switch between LOD levels
+    SUPPORTS_LODS = True
+
     def __init__(self,
             engine: "Engine",
             meshes: list[ObjMesh],
@@ -42,7 +47,8 @@ class Model:
         self.engine = engine
 
         self.program_name = program_name
-        self.program = self.engine.renderer.get_shader(self.program_name)
+        self.program = self.load_program()
+        self.uniforms = self.engine.renderer.uniforms(self.program)
 
         self.meshes = meshes
         self.color = color
@@ -50,54 +56,228 @@ class Model:
 
         # Internal ModernGL objects
         self.vbo: moderngl.Buffer = None
-        self.nbo: moderngl.Buffer = None
-        self.uvbo: moderngl.Buffer = None
+        self.ibo: Optional[moderngl.Buffer] = None
         self.vao: moderngl.VertexArray = None
 
+        # Per-vertex texture array layers, only used with texture arrays
+        self.layer_buffer: Optional[moderngl.Buffer] = None
+
+        # Geometry shared with other models, buffers are the model's own if None
+        self.shared_mesh: Optional[SharedMesh] = None
+
+        # Textures from the renderer's texture cache
+        self.texture: Optional[SharedTexture] = None
+        self.textures: list[SharedTexture] = []
+
+        # Model space bounds used for culling, models without bounds are never culled
+        self.bounds: Optional[Bounds] = None
+
+        # Coarser levels of the geometry, the full geometry is level 0
+        self.lods: list[SharedMesh] = []
+        self.lod_level = 0
+        self.lod_screen_sizes = lod.DEFAULT_SCREEN_SIZES
+        self.lod_hysteresis = lod.DEFAULT_HYSTERESIS
+
     @property
     def color(self):
         return self.__color
     
     @color.setter
     def color(self, new_value: Union[tuple[float, float, float], glm.vec4]):
+        # Programs are shared, color uniform is set in update
         self.__color = new_value
 
-        if self.program_name in ("flat", "unlitflat"):
-            self.program["u_color"] = self.__color
+    def load_program(self) -> moderngl.Program:
+        """ Get shader program of the model. """
+        return self.engine.renderer.get_shader(self.program_name)
 
     def create_vao(self):
         """ Create VAO. """
         raise NotImplementedError
 
+    def use_shared_mesh(self, shared_mesh: SharedMesh):
+        """ Use shared mesh's buffers and its VAO for the model's program. """
+
+        self.shared_mesh = shared_mesh
+
+        self.vbo = self.shared_mesh.vbo
+        self.ibo = self.shared_mesh.ibo
+
+        if self.layer_buffer is None:
+            self.vao = self.shared_mesh.vao(self.program)
+
+        # Layer buffer is the model's own, so is the VAO
+        else:
+            self.vao = self.engine.renderer.create_vao(
+                self.program,
+                self.vbo,
+                self.ibo,
+                layer_buffer=self.layer_buffer
+            )
+
+    def create_vao_from_mesh(self, mesh: ObjMesh):
+        """ Create buffers and VAO from mesh, indexed if the mesh is. """
+
+        self.vbo = self.engine.renderer.create_bo(mesh.data)
+
+        if mesh.indices is None: self.ibo = None
+        else: self.ibo = self.engine.renderer.create_bo(mesh.indices)
+
+        self.vao = self.engine.renderer.create_vao(
+            self.program,
+            self.vbo,
+            self.ibo,
+            layer_buffer=self.layer_buffer
+        )
+
     def update(self,
             model: glm.mat4,
             projection: glm.mat4,
             view: glm.mat4,
             camera: "Camera",
-            light: "BasicLight"
+            light: "BasicLight",
+            normal_matrix: Optional[glm.mat3] = None
         ):
-        """ Update shader uniforms. """
+        """
+        Update shader uniforms of the model.
+
+        Camera and light uniforms are shared by all programs and written
+        once per frame, see Renderer.update_frame. Normal matrix is computed
+        from the model matrix if it's not given.
+        """
+
+        if normal_matrix is None: normal_matrix = glm.transpose(glm.inverse(glm.mat3(model)))
 
         # Vertex shader uniforms
-        self.program["u_model"].value = flatten_mat(model)
-        self.program["u_projection"].value = flatten_mat(projection)
-        self.program["u_view"].value = flatten_mat(view)
+        self.uniforms.set("u_model", model)
+        self.uniforms.set("u_normal_matrix", normal_matrix)
 
         # Fragment shader uniforms
-        if self.program_name in ("base", "flat", "normal"):
-            self.program["u_view_position"] = camera.position.to_tuple()
-            self.program["u_light_position"] = light.position.to_tuple()
-
-            self.program["u_light_color"].value = light.color.to_tuple()
-            self.program["u_ambient_intensity"].value = light.ambient_intensity
-            self.program["u_diffuse_intensity"].value = light.diffuse_intensity
-            self.program["u_specular_intensity"].value = light.specular_intensity
-            self.program["u_specular_power"].value = light.specular_power
+        if self.program_name in ("flat", "unlitflat"):
+            self.uniforms.set("u_color", self.color)
+
+        if len(self.lods) > 0 and self.bounds is not None:
+            self.update_lod(model, projection, camera)
+
+    def update_lod(self, model: glm.mat4, projection: glm.mat4, camera: "Camera"):
+        """ Select LOD level from the screen size of the model's bounding sphere. """
+
+        center, radius = self.bounds.sphere(model)
+        size = lod.screen_size(radius, glm.distance(center, camera.position), projection[1][1])
+
+        level = lod.select_level(
+            size,
+            self.lod_level,
+            self.lod_screen_sizes[:len(self.lods)],
+            self.lod_hysteresis
+        )
+
+        if level != self.lod_level: self.use_lod(level)
+
+    def use_lod(self, level: int):
+        """ Draw LOD level, 0 is the full geometry. """
+        raise NotImplementedError
     
+    def build_draw_ranges(self, meshes: list[ObjMesh]) -> list[tuple[SharedTexture, int, int]]:
+        """
+        Build draw range table of meshes merged into the model's buffers.
+
+        Consecutive meshes with the same texture are merged into one range.
+
+        @param meshes Meshes in the order they are merged, one per texture
+        @return List of (texture, first, count) ranges
+        """
+
+        # Texture array covers all meshes
+        if self.layer_buffer is not None:
+            return [(self.texture, 0, sum(mesh.draw_count for mesh in meshes))]
+
+        ranges = []
+        first = 0
+
+        for mesh, texture in zip(meshes, self.textures):
+            count = mesh.draw_count
+
+            if len(ranges) > 0 and ranges[-1][0] is texture:
+                ranges[-1] = (texture, ranges[-1][1], ranges[-1][2] + count)
+            else:
+                ranges.append((texture, first, count))
+
+            first += count
+
+        return ranges
+
     def render(self):
         """ Render model. """
         raise NotImplementedError
 
+    def release(self):
+        """
+        Release GPU resources of the model.
+
+        Shared geometry is only released when its last user releases it.
+        """
+
+        if self.shared_mesh is not None:
+            if self.layer_buffer is not None: self.vao.release()
+            self.shared_mesh.release()
+            self.shared_mesh = None
+
+        else:
+            if self.vao is not None: self.vao.release()
+            if self.vbo is not None: self.vbo.release()
+            if self.ibo is not None: self.ibo.release()
+
+        if self.layer_buffer is not None: self.layer_buffer.release()
+
+        for shared_mesh in self.lods: shared_mesh.release()
+        self.lods = []
+        self.lod_level = 0
+
+        self.vao = None
+        self.vbo = None
+        self.ibo = None
+        self.layer_buffer = None
+
+        self.release_textures()
+
+    def create_texture_array(self,
+            meshes: list[ObjMesh],
+            filepaths: list[Union[Path, str]],
+            repeat: bool = False,
+            build_mipmaps: bool = True
+            ):
+        """
+        Load textures of meshes into one texture array and create the layer buffer.
+
+        Every vertex gets the layer of its mesh's texture, so all meshes can
+        be drawn in one call. Must be called before the VAO is created.
+
+        @param meshes Meshes in the order they are merged
+        @param filepaths Texture path of each mesh
+        @param repeat Repeat texture on both axes
+        @param build_mipmaps Build mipmaps after uploading
+        """
+
+        layers = {}
+        for filepath in filepaths: layers.setdefault(str(filepath), len(layers))
+
+        self.texture = self.engine.renderer.textures.load_array(list(layers), repeat, build_mipmaps)
+
+        mesh_layers = np.array([layers[str(filepath)] for filepath in filepaths], dtype=np.float32)
+        self.layer_buffer = self.engine.renderer.create_bo(
+            np.repeat(mesh_layers, [mesh.vertex_count for mesh in meshes])
+        )
+
+    def release_textures(self):
+        """ Release references to cached textures. """
+
+        if self.texture is not None: self.texture.release()
+        for texture in self.textures: texture.release()
+
+        self.texture = None
+        self.textures = []
+
 
 class BasicModel(Model):
     """
@@ -114,7 +294,8 @@ class BasicModel(Model):
             texture_repeat: bool = False,
             build_mipmaps: bool = True,
             program_name: Optional[str] = "base",
-            wireframe: bool = False
+            wireframe: bool = False,
+            shared_mesh: Optional[SharedMesh] = None
             ):
         super().__init__(
             engine,
@@ -124,6 +305,8 @@ class BasicModel(Model):
             wireframe=wireframe
         )
 
+        self.shared_mesh = shared_mesh
+
         # Basic model has only one mesh
         self.mesh = self.meshes[0]
 
@@ -137,45 +320,40 @@ class BasicModel(Model):
             repeat: bool = False,
             build_mipmaps: bool = False
             ):
-        """ Load and create texture. """
+        """ Load texture through the renderer's texture cache. """
 
-        surface = pygame.image.load(filepath)
-        format = "RGB" # TODO: Detect format
+        # TODO: Detect format
+        self.texture = self.engine.renderer.textures.load(filepath, repeat, build_mipmaps)
 
-        self.texture = self.engine.renderer.context.texture(
-            surface.get_size(),
-            len(format),
-            pygame.image.tostring(surface, format, True)
-        )
+    def create_vao(self):
+        """ Create VAO, uploading the meshes if they're not shared yet. """
 
-        self.texture.repeat_x = repeat
-        self.texture.repeat_y = repeat
+        if self.shared_mesh is None:
+            self.shared_mesh = self.engine.renderer.meshes.add(self.meshes)
 
-        if build_mipmaps: self.texture.build_mipmaps()
+        self.use_shared_mesh(self.shared_mesh)
 
-    def create_vao(self):
-        """ Create VAO. """
+        self.bounds = self.shared_mesh.bounds[0]
 
-        self.vbo = self.engine.renderer.create_bo(self.mesh.vertices)
-        self.nbo = self.engine.renderer.create_bo(self.mesh.normals)
-        self.uvbo = self.engine.renderer.create_bo(self.mesh.uv_coords)
+    def use_lod(self, level: int):
+        """ Draw LOD level, 0 is the full mesh. """
 
-        self.vao = self.engine.renderer.context.vertex_array(
-            self.program,
-            [
-                (self.vbo,  "3f", "in_position"),
-                (self.nbo,  "3f", "in_normal"),
-                (self.uvbo, "2f", "in_uv")
-            ]
-        )
+        self.lod_level = level
+
+        if level == 0: shared_mesh = self.shared_mesh
+        else: shared_mesh = self.lods[level - 1]
+
+        self.vao = shared_mesh.vao(self.program)
+        self.mesh = shared_mesh.meshes[0]
 
     def render(self):
         """ Render model. """
 
         if self.texture is not None: self.texture.use(0)
 
-        if self.wireframe: self.vao.render(moderngl.LINES)
-        else: self.vao.render()
+        # Only the first mesh is drawn, it's at the start of the shared buffers
+        if self.wireframe: self.vao.render(moderngl.LINES, vertices=self.mesh.draw_count)
+        else: self.vao.render(vertices=self.mesh.draw_count)
 
     @classmethod
     def from_obj(cls,
@@ -186,23 +364,43 @@ class BasicModel(Model):
             texture_repeat: bool = False,
             build_mipmaps: bool = True,
             program_name: Optional[str] = "base",
-            wireframe: bool = False
+            wireframe: bool = False,
+            use_cache: bool = True,
+            lods: bool = False
             ):
-        """ Create model from OBJ file. """
+        """
+        Create model from OBJ file.
+
+        The parsed mesh is cooked into a binary file next to the OBJ file
+        and memory-mapped on the next loads unless use_cache is False. Models
+        of the same file share the uploaded mesh.
+
+        If lods is True, the LOD levels of the file are loaded (and built
+        next to it if they're missing) and the model switches between them
+        by its size on screen, models that don't support LODs raise
+        ValueError.
+        """
+
+        if lods and not cls.SUPPORTS_LODS: raise ValueError(f"{cls.__name__} doesn't support LODs")
         
-        obj = parse(obj_path)
+        shared_mesh = engine.renderer.meshes.load_obj(obj_path, use_cache)
 
-        return cls(
+        model = cls(
             engine,
-            obj.meshes,
+            shared_mesh.meshes,
             color=color,
             texture_path=texture_path,
             texture_repeat=texture_repeat,
             build_mipmaps=build_mipmaps,
             program_name=program_name,
-            wireframe=wireframe
+            wireframe=wireframe,
+            shared_mesh=shared_mesh
         )
 
+        if lods: model.lods = engine.renderer.meshes.load_obj_lods(obj_path, use_cache)
+
+        return model
+
     @classmethod
     def from_plane(cls,
             engine: "Engine",
@@ -215,21 +413,20 @@ class BasicModel(Model):
             program_name: Optional[str] = "base",
             wireframe: bool = False
             ):
-        """ Create model from plane geometry. """
+        """ Create model from plane geometry, shared with models of the same size. """
         
-        vertices, normals, uv_coords = create_plane_mesh(size, scale_uv_coords)
-
-        mesh = ObjMesh("", vertices, normals, uv_coords)
+        shared_mesh = engine.renderer.meshes.load_plane(size, scale_uv_coords)
 
         return cls(
             engine,
-            [mesh],
+            shared_mesh.meshes,
             color=color,
             texture_path=texture_path,
             texture_repeat=texture_repeat,
             build_mipmaps=build_mipmaps,
             program_name=program_name,
-            wireframe=wireframe
+            wireframe=wireframe,
+            shared_mesh=shared_mesh
         )
     
     @classmethod
@@ -244,24 +441,291 @@ class BasicModel(Model):
             program_name: Optional[str] = "base",
             wireframe: bool = False
             ):
-        """ Create model from cube geometry. """
+        """ Create model from cube geometry, shared with models of the same size. """
         
-        vertices, normals, uv_coords = create_cube_mesh(size, scale_uv_coords)
-
-        mesh = ObjMesh("", vertices, normals, uv_coords)
+        shared_mesh = engine.renderer.meshes.load_cube(size, scale_uv_coords)
 
         return cls(
             engine,
-            [mesh],
+            shared_mesh.meshes,
             color=color,
             texture_path=texture_path,
             texture_repeat=texture_repeat,
             build_mipmaps=build_mipmaps,
             program_name=program_name,
-            wireframe=wireframe
+            wireframe=wireframe,
+            shared_mesh=shared_mesh
         )
     
 
+class InstancedModel(BasicModel):
+    """
+    Model that draws all of its instances with one draw call.
+
+    Every instance has its own model matrix and color in the instance
+    buffer. Instances are created with create_instance and used as models of
+    entities, updating an entity only writes its instance's slot. The
+    instanced model itself is drawn once after all entities are updated.
+
+    Consider using helper constructors instead of creating it manually.
+    """
+
+    # Number of floats per instance, model matrix, color and normal matrix
+    INSTANCE_SIZE = sum(components for _, components in INSTANCE_LAYOUT)
+
+    # Instances are never updated one by one, so they can't pick LOD levels
+    SUPPORTS_LODS = False
+
+    def __init__(self,
+            engine: "Engine",
+            meshes: list[ObjMesh],
+            color: Union[tuple[float, float, float], glm.vec4] = (1.0, 1.0, 1.0, 1.0),
+            texture_path: Optional[Union[Path, str]] = None,
+            texture_repeat: bool = False,
+            build_mipmaps: bool = True,
+            program_name: Optional[str] = "base",
+            wireframe: bool = False,
+            shared_mesh: Optional[SharedMesh] = None,
+            capacity: int = 64
+            ):
+        # Instances in slot order and their data, only the first
+        # len(instances) rows are drawn
+        self.instances: list["ModelInstance"] = []
+        self.instance_data = np.zeros((max(capacity, 1), self.INSTANCE_SIZE), dtype=np.float32)
+        self.instance_buffer: moderngl.Buffer = None
+
+        # Range of slots that changed since the last upload
+        self.__dirty = (0, 0)
+
+        super().__init__(
+            engine,
+            meshes,
+            color=color,
+            texture_path=texture_path,
+            texture_repeat=texture_repeat,
+            build_mipmaps=build_mipmaps,
+            program_name=program_name,
+            wireframe=wireframe,
+            shared_mesh=shared_mesh
+        )
+
+    @property
+    def color(self):
+        return self.__color
+
+    @color.setter
+    def color(self, new_value: Union[tuple[float, float, float], glm.vec4]):
+        # Default color of new instances, colors are per instance
+        self.__color = new_value
+
+    @property
+    def capacity(self) -> int:
+        """ Number of instances that fit into the instance buffer. """
+        return len(self.instance_data)
+
+    def load_program(self) -> moderngl.Program:
+        """ Get the instanced variant of the shader program. """
+        return self.engine.renderer.get_shader(self.program_name, instanced=True)
+
+    def use_shared_mesh(self, shared_mesh: SharedMesh):
+        """ Use shared mesh's buffers with the model's own instance buffer and VAO. """
+
+        self.shared_mesh = shared_mesh
+
+        self.vbo = self.shared_mesh.vbo
+        self.ibo = self.shared_mesh.ibo
+
+        self.instance_buffer = self.engine.renderer.create_bo(self.instance_data)
+
+        self.vao = self.engine.renderer.create_vao(
+            self.program,
+            self.vbo,
+            self.ibo,
+            self.instance_buffer
+        )
+
+    def __mark_dirty(self, slot: int):
+        start, end = self.__dirty
+        if start == end: self.__dirty = (slot, slot + 1)
+        else: self.__dirty = (min(start, slot), max(end, slot + 1))
+
+    def create_instance(self,
+            color: Optional[Union[tuple[float, float, float], glm.vec4]] = None
+            ) -> "ModelInstance":
+        """
+        Create new instance.
+
+        @param color Color of the instance, model's color if None
+        @return Instance to use as the model of an entity
+        """
+
+        if len(self.instances) == self.capacity:
+            # Grow the instance buffer, the VAO keeps referring to it
+            self.instance_data = np.concatenate((self.instance_data, np.zeros_like(self.instance_data)))
+            self.instance_buffer.orphan(self.instance_data.nbytes)
+            self.__dirty = (0, len(self.instances))
+
+        instance = ModelInstance(self, len(self.instances))
+        self.instances.append(instance)
+
+        self.write_matrix(instance.slot, glm.mat4())
+        instance.color = self.color if color is None else color
+
+        return instance
+
+    def remove_instance(self, instance: "ModelInstance"):
+        """
+        Remove instance, the last instance is moved into its slot.
+
+        The removed instance is detached from the model, updating it or
+        setting its color has no effect anymore.
+        """
+
+        if instance.model is not self or instance.slot < 0:
+            raise ValueError("instance is not an instance of this model")
+
+        slot = instance.slot
+        last = self.instances.pop()
+
+        if last is not instance:
+            self.instances[slot] = last
+            self.instance_data[slot] = self.instance_data[last.slot]
+            last.slot = slot
+            self.__mark_dirty(slot)
+
+        instance.detach()
+
+    def write_matrix(self, slot: int, model: glm.mat4, normal_matrix: Optional[glm.mat3] = None):
+        """ Write model matrix and normal matrix (computed if not given) of the instance in slot. """
+
+        if normal_matrix is None: normal_matrix = glm.transpose(glm.inverse(glm.mat3(model)))
+
+        self.instance_data[slot, :16] = np.frombuffer(model.to_bytes(), dtype=np.float32)
+        self.instance_data[slot, 20:29] = np.frombuffer(normal_matrix.to_bytes(), dtype=np.float32)
+        self.__mark_dirty(slot)
+
+    def write_color(self, slot: int, color: Union[tuple[float, float, float], glm.vec4]):
+        """ Write color of the instance in slot. """
+        color = tuple(color)
+        self.instance_data[slot, 16:20] = color if len(color) == 4 else (*color, 1.0)
+        self.__mark_dirty(slot)
+
+    def update(self,
+            model: glm.mat4,
+            projection: glm.mat4,
+            view: glm.mat4,
+            camera: "Camera",
+            light: "BasicLight",
+            normal_matrix: Optional[glm.mat3] = None
+        ):
+        """ Model matrices and colors come from the instances. """
+        pass
+
+    def render(self):
+        """ Render all instances. """
+
+        if len(self.instances) == 0: return
+
+        # Upload changed slots only
+        start, end = self.__dirty
+        if start < end:
+            self.instance_buffer.write(
+                self.instance_data[start:end],
+                offset=start * self.instance_data.itemsize * self.INSTANCE_SIZE
+            )
+            self.__dirty = (0, 0)
+
+        if self.texture is not None: self.texture.use(0)
+
+        if self.wireframe:
+            self.vao.render(moderngl.LINES, vertices=self.mesh.draw_count, instances=len(self.instances))
+        else:
+            self.vao.render(vertices=self.mesh.draw_count, instances=len(self.instances))
+
+    def release(self):
+        """ Release GPU resources of the model and its instance buffer. """
+
+        self.vao.release()
+        self.instance_buffer.release()
+        self.instance_buffer = None
+
+        self.shared_mesh.release()
+        self.shared_mesh = None
+
+        self.vao = None
+        self.vbo = None
+        self.ibo = None
+
+        self.release_textures()
+
+
+class ModelInstance:
+    """
+    One instance of an instanced model.
+
+    Can be used as the model of an entity. Updating it only writes the
+    instance's slot, instances are drawn by their instanced model.
+    """
+
+    def __init__(self, model: InstancedModel, slot: int):
+        self.model = model
+        self.slot = slot
+        self.__color = None
+
+        # Instances are drawn all at once by their model, they are never culled
+        self.bounds = None
+
+        # Last written model matrix, entities hand out the same matrix until they move
+        self.__matrix = None
+
+    @property
+    def program_name(self) -> Optional[str]:
+        return None if self.model is None else self.model.program_name
+
+    @property
+    def color(self):
+        return self.__color
+
+    @color.setter
+    def color(self, new_value: Union[tuple[float, float, float], glm.vec4]):
+        self.__color = new_value
+        if self.slot >= 0: self.model.write_color(self.slot, self.__color)
+
+    @property
+    def removed(self) -> bool:
+        """ Whether the instance was removed from its model. """
+        return self.slot < 0
+
+    def remove(self):
+        """ Remove instance from its model, does nothing if it's already removed. """
+        if self.slot >= 0: self.model.remove_instance(self)
+
+    def detach(self):
+        """ Forget the model and slot, called by the model when the instance is removed. """
+        self.model = None
+        self.slot = -1
+        self.__matrix = None
+
+    def update(self,
+            model: glm.mat4,
+            projection: glm.mat4,
+            view: glm.mat4,
+            camera: "Camera",
+            light: "BasicLight",
+            normal_matrix: Optional[glm.mat3] = None
+        ):
+        """ Write model matrix into the instance buffer if it changed. """
+
+        if self.slot < 0 or model is self.__matrix: return
+        self.__matrix = model
+
+        self.model.write_matrix(self.slot, model, normal_matrix)
+
+    def render(self):
+        """ Instances are drawn all at once by their model, see InstancedModel.render. """
+        pass
+
+
 class MultiMaterialModel(Model):
     """
     Model with multiple meshes with different materials.
@@ -276,97 +740,170 @@ class MultiMaterialModel(Model):
             program_name: Optional[str] = "base",
             texture_repeat: bool = False,
             build_mipmaps: bool = True,
-            wireframe: bool = False
+            wireframe: bool = False,
+            shared_mesh: Optional[SharedMesh] = None,
+            texture_array: bool = False
             ):
+        self.texture_array = texture_array
+
         super().__init__(engine, meshes, color, program_name, wireframe)
 
+        self.shared_mesh = shared_mesh
+
         self.create_textures(texture_repeat, build_mipmaps)
 
         self.create_vao()
 
+    def load_program(self) -> moderngl.Program:
+        """ Get shader program of the model, the texture array variant if it's used. """
+        return self.engine.renderer.get_shader(self.program_name, texture_array=self.texture_array)
+
     def create_textures(self, repeat: bool = False, build_mipmaps: bool = True):
-        """ Load and create textures. """
+        """ Load textures through the renderer's texture cache. """
 
-        self.textures = []
+        filepaths = [f"assets/textures/headcrab/{mesh.material}" for mesh in self.meshes]
 
-        for mesh in self.meshes:
-            surface = pygame.image.load(f"assets/textures/headcrab/{mesh.material}")
-            # TODO: Detect format
-            format = "RGB"
+        if self.texture_array:
+            self.create_texture_array(self.meshes, filepaths, repeat, build_mipmaps)
+            return
 
-            texture = self.engine.renderer.context.texture(
-                surface.get_size(),
-                len(format),
-                pygame.image.tostring(surface, format, True)
-            )
+        self.textures = [
+            self.engine.renderer.textures.load(filepath, repeat, build_mipmaps)
+            for filepath in filepaths
+        ]
 
-            texture.repeat_x = repeat
-            texture.repeat_y = repeat
+    def create_vao(self):
+        """ Create VAO, uploading the meshes if they're not shared yet. """
 
-            if build_mipmaps: texture.build_mipmaps()
+        # All meshes are merged into the shared buffers
+        if self.shared_mesh is None:
+            self.shared_mesh = self.engine.renderer.meshes.add(self.meshes)
 
-            self.textures.append(texture)
+        self.use_shared_mesh(self.shared_mesh)
 
-    def create_vao(self):
-        """ Create VAO. """
+        self.draw_ranges = self.build_draw_ranges(self.meshes)
+        self.bounds = Bounds.union(self.shared_mesh.bounds)
 
-        # Merge all meshes info into single array
-        vertices = []
-        normals = []
-        uv_coords = []
-        for mesh in self.meshes: vertices += mesh.vertices
-        for mesh in self.meshes: normals += mesh.normals
-        for mesh in self.meshes: uv_coords += mesh.uv_coords
+    def use_lod(self, level: int):
+        """ Draw LOD level, 0 is the full mesh. """
 
-        self.vbo = self.engine.renderer.create_bo(vertices)
-        self.nbo = self.engine.renderer.create_bo(normals)
-        self.uvbo = self.engine.renderer.create_bo(uv_coords)
+        self.lod_level = level
 
-        self.vao = self.engine.renderer.context.vertex_array(
-            self.program,
-            [
-                (self.vbo,  "3f", "in_position"),
-                (self.nbo,  "3f", "in_normal"),
-                (self.uvbo, "2f", "in_uv")
-            ]
-        )
+        if level == 0: shared_mesh = self.shared_mesh
+        else: shared_mesh = self.lods[level - 1]
+
+        self.vao = shared_mesh.vao(self.program)
+        self.draw_ranges = self.build_draw_ranges(shared_mesh.meshes)
 
     def render(self):
         """ Render model. """
 
-        for i, mesh in enumerate(self.meshes):
-            self.textures[i].use(0)
+        for texture, first, count in self.draw_ranges:
+            texture.use(0)
+
+            if self.wireframe: self.vao.render(moderngl.LINES, vertices=count, first=first)
+            else: self.vao.render(vertices=count, first=first)
+
+    @classmethod
+    def from_obj(cls,
+            engine: "Engine",
+            obj_path: Union[Path, str],
+            color: Union[tuple[float, float, float], glm.vec4] = (1.0, 1.0, 1.0, 1.0),
+            program_name: Optional[str] = "base",
+            texture_repeat: bool = False,
+            build_mipmaps: bool = True,
+            wireframe: bool = False,
+            use_cache: bool = True,
+            texture_array: bool = False,
+            lods: bool = False
+            ):
+        """
+        Create model from OBJ file.
+
+        Models of the same file share the uploaded mesh, see BasicModel.from_obj.
+        If texture_array is True, textures are packed into a texture array
+        and the whole model is drawn in one call.
+
+        If lods is True, the model switches between LOD levels of the file
+        by its size on screen, see BasicModel.from_obj. Texture array layers
+        only cover the full mesh, so LODs are not used with texture arrays.
+        """
 
-            # Get the starting index for render
-            start = 0
-            for j in range(i):
-                start += len(self.meshes[j].vertices) // 3
+        shared_mesh = engine.renderer.meshes.load_obj(obj_path, use_cache)
+
+        model = cls(
+            engine,
+            shared_mesh.meshes,
+            color=color,
+            program_name=program_name,
+            texture_repeat=texture_repeat,
+            build_mipmaps=build_mipmaps,
+            wireframe=wireframe,
+            shared_mesh=shared_mesh,
+            texture_array=texture_array
+        )
 
-            # Get the number of vertices to render
-            verts = len(mesh.vertices) // 3
+        if lods and not texture_array:
+            model.lods = engine.renderer.meshes.load_obj_lods(obj_path, use_cache)
 
-            if self.wireframe: self.vao.render(moderngl.LINES, vertices=verts, first=start)
-            else: self.vao.render(vertices=verts, first=start)
+        return model
 
 
-class BasicAnimatedModel(Model):
+class AnimationClock:
     """
-    Basic animated 3D model with only one material and texture.
+    Animation clock shared by all animated models of an engine.
 
-    Consider using helper constructors instead of creating it manually.
+    The clock is ticked once per engine frame with the frame's delta time.
+    Each animated model remembers the clock time of its last update and
+    advances by the clock time passed since then, so a model updated twice
+    in a frame advances once and a model that wasn't updated for a while
+    catches up on the time it missed.
     """
 
+    def __init__(self):
+        self.time = 0.0
+        self.dt = 0.0
+
+        # Playback speed multiplier, 0 freezes all animations
+        self.scale = 1.0
+
+    def tick(self, dt: float):
+        """ Advance the clock by delta time in seconds. """
+        self.dt = dt * self.scale
+        self.time += self.dt
+
+
+class AnimatedModel(Model):
+    """
+    Base class for animated models.
+
+    Playback is driven by the engine's animation clock and the frame rate of
+    the animation, so it doesn't depend on the rendering frame rate. If
+    interpolation is enabled the model is blended between keyframes, which
+    lets animations be authored at low frame rates and still play smoothly.
+
+    By default the current frame is written into the vertex buffer every
+    time the frame changes. With GPU playback all frames are uploaded once
+    into a float texture and the animated vertex shader fetches (and
+    optionally blends between) frames by index, so playing only costs a few
+    uniform writes per draw.
+    """
+
+    # Width of the frames texture in texels
+    FRAMES_TEXTURE_WIDTH = 4096
+
     def __init__(self,
             engine: "Engine",
             meshes: list[ObjMesh],
             obj_animation: ObjAnimation,
             color: Union[tuple[float, float, float], glm.vec4] = (1.0, 1.0, 1.0, 1.0),
-            texture_path: Optional[Union[Path, str]] = None,
-            texture_repeat: bool = False,
-            build_mipmaps: bool = True,
             program_name: Optional[str] = "base",
-            wireframe: bool = False
+            wireframe: bool = False,
+            gpu_playback: bool = False,
+            interpolate: bool = True
             ):
+        self.gpu_playback = gpu_playback
+
         super().__init__(
             engine,
             meshes,
@@ -379,16 +916,37 @@ class BasicAnimatedModel(Model):
         self.frame = 0
         self.frame_count = self.obj_animation.frame_count
         self.frames = self.obj_animation.frames
+        self.fps = self.obj_animation.fps
         self.is_playing = False
         self.loop = False
 
-        if texture_path is None: self.texture = None
-        else: self.create_texture(texture_path, texture_repeat, build_mipmaps)
+        # Playback time in seconds and blend factor towards the next frame
+        self.time = 0.0
+        self.blend = 0.0
+        self.interpolate = interpolate
 
-        self.create_vao()
+        # Frame and blend factor that are currently in the vertex buffers
+        self.__written = (0, 0.0)
+
+        # Animation clock time of the last update, playback catches up on
+        # the time the model wasn't updated (e.g. while it was culled)
+        self.__clock_time: Optional[float] = None
+
+        self.frames_texture: Optional[moderngl.Texture] = None
+
+        # Bounds cover the whole animation
+        self.bounds = Bounds(*self.obj_animation.position_range())
+
+        if self.gpu_playback: self.create_frames_texture()
+
+    def load_program(self) -> moderngl.Program:
+        """ Get shader program of the model, the animated variant with GPU playback. """
+        return self.engine.renderer.get_shader(self.program_name, animated=self.gpu_playback)
 
     def play(self, loop: bool = False):
         self.frame = 0
+        self.time = 0.0
+        self.blend = 0.0
         self.is_playing = True
         self.loop = loop
 
@@ -401,74 +959,200 @@ class BasicAnimatedModel(Model):
     def unpause(self):
         self.is_playing = True
 
-    def create_texture(self,
-            filepath: Union[Path, str],
-            repeat: bool = False,
-            build_mipmaps: bool = False
-            ):
-        """ Load and create texture. """
+    @property
+    def duration(self) -> float:
+        """ Length of the animation in seconds. """
+        if self.loop: return self.frame_count / self.fps
+        return (self.frame_count - 1) / self.fps
 
-        surface = pygame.image.load(filepath)
-        format = "RGB" # TODO: Detect format
+    @property
+    def next_frame(self) -> int:
+        """ Frame that comes after the current one. """
+        if self.frame + 1 < self.frame_count: return self.frame + 1
+        return 0 if self.loop else self.frame
 
-        self.texture = self.engine.renderer.context.texture(
-            surface.get_size(),
-            len(format),
-            pygame.image.tostring(surface, format, True)
-        )
+    def create_frames_texture(self):
+        """
+        Upload all frames into a float texture for GPU playback.
 
-        self.texture.repeat_x = repeat
-        self.texture.repeat_y = repeat
+        Frames are interleaved into vertex data for the upload, every vertex
+        of every frame takes two RGBA texels.
+        """
 
-        if build_mipmaps: self.texture.build_mipmaps()
+        if self.obj_animation.lazy:
+            texels = np.stack([self.obj_animation.frame_data(i) for i in range(self.frame_count)])
+        else:
+            texels = self.frames.frame_data(slice(None))
 
-    def create_vao(self):
-        """ Create VAO. """
+        texels = np.ascontiguousarray(texels, dtype=np.float32).reshape(-1, 4)
+
+        self.frames_vertex_count = len(texels) // 2 // self.frame_count
+        self.frames_width = min(len(texels), self.FRAMES_TEXTURE_WIDTH)
+        height = -(-len(texels) // self.frames_width)
+
+        texels = np.pad(texels, ((0, self.frames_width * height - len(texels)), (0, 0)))
 
-        mesh = self.frames[0].meshes[0]
+        self.frames_texture = self.engine.renderer.context.texture(
+            (self.frames_width, height),
+            4,
+            texels,
+            dtype="f4"
+        )
+        self.frames_texture.filter = (moderngl.NEAREST, moderngl.NEAREST)
+
+    def create_vao_from_mesh(self, mesh: ObjMesh):
+        """ Create buffers and VAO from mesh. """
 
-        self.vbo = self.engine.renderer.create_bo(mesh.vertices)
-        self.nbo = self.engine.renderer.create_bo(mesh.normals)
-        self.uvbo = self.engine.renderer.create_bo(mesh.uv_coords)
+        if not self.gpu_playback:
+            super().create_vao_from_mesh(mesh)
+            return
 
-        self.vao = self.engine.renderer.context.vertex_array(
+        # Vertex attributes are fetched from the frames texture
+        self.ibo = self.engine.renderer.create_bo(mesh.indices)
+        self.vao = self.engine.renderer.create_vao(
             self.program,
-            [
-                (self.vbo,  "3f", "in_position"),
-                (self.nbo,  "3f", "in_normal"),
-                (self.uvbo, "2f", "in_uv")
-            ]
+            None,
+            self.ibo,
+            layer_buffer=self.layer_buffer
         )
 
+    def write_frame(self):
+        """ Write current frame, blended towards the next one, into the vertex buffer. """
+
+        if self.__written == (self.frame, self.blend): return
+        self.__written = (self.frame, self.blend)
+
+        data = self.obj_animation.frame_data(self.frame)
+
+        if self.blend > 0.0:
+            next_data = self.obj_animation.frame_data(self.next_frame)
+            data = data + (next_data - data) * self.blend
+
+        self.vbo.write(self.engine.renderer.to_buffer(data))
+
+    def advance(self, dt: float):
+        """
+        Advance playback time and pick the current frame and blend factor.
+
+        @param dt Delta time in seconds
+        """
+
+        self.time += dt
+
+        if self.loop:
+            self.time %= self.duration
+            position = self.time * self.fps
+
+        else:
+            self.time = min(self.time, self.duration)
+            position = self.time * self.fps
+
+        frame = min(int(position), self.frame_count - 1)
+
+        if frame != self.frame and not self.gpu_playback:
+            self.obj_animation.prefetch(frame + 1)
+
+        self.frame = frame
+        self.blend = position - frame if self.interpolate else 0.0
+
+        if not self.gpu_playback: self.write_frame()
+
     def update(self,
             model: glm.mat4,
             projection: glm.mat4,
             view: glm.mat4,
             camera: "Camera",
-            light: "BasicLight"
+            light: "BasicLight",
+            normal_matrix: Optional[glm.mat3] = None
         ):
-        """ Update model. """
-        super().update(model, projection, view, camera, light)
+        """ Advance playback by the clock time since the last update and update shader uniforms. """
+
+        clock = self.engine.animation_clock
 
         if self.is_playing:
-            self.frame += 1
-            if self.frame == self.frame_count:
-                if self.loop: self.frame = 0
-                else: self.frame = self.frame_count - 1
+            if self.__clock_time is None: self.advance(clock.dt)
+            else: self.advance(clock.time - self.__clock_time)
+
+        self.__clock_time = clock.time
+
+        super().update(model, projection, view, camera, light, normal_matrix)
+
+        if self.gpu_playback:
+            # Animated programs are shared between models
+            self.uniforms.set("s_frames", 1)
+            self.uniforms.set("u_frames_width", self.frames_width)
+            self.uniforms.set("u_vertex_count", self.frames_vertex_count)
+            self.uniforms.set("u_frame_a", self.frame)
+            self.uniforms.set("u_frame_b", self.next_frame)
+            self.uniforms.set("u_blend", self.blend)
+
+    def use_textures(self):
+        """ Bind frames texture if GPU playback is used. """
+        if self.gpu_playback: self.frames_texture.use(1)
+
+    def release(self):
+        """ Release GPU resources of the model and its frames texture. """
+
+        if self.frames_texture is not None: self.frames_texture.release()
+        self.frames_texture = None
+
+        super().release()
+
+
+class BasicAnimatedModel(AnimatedModel):
+    """
+    Basic animated 3D model with only one material and texture.
+
+    Consider using helper constructors instead of creating it manually.
+    """
+
+    def __init__(self,
+            engine: "Engine",
+            meshes: list[ObjMesh],
+            obj_animation: ObjAnimation,
+            color: Union[tuple[float, float, float], glm.vec4] = (1.0, 1.0, 1.0, 1.0),
+            texture_path: Optional[Union[Path, str]] = None,
+            texture_repeat: bool = False,
+            build_mipmaps: bool = True,
+            program_name: Optional[str] = "base",
+            wireframe: bool = False,
+            gpu_playback: bool = False,
+            interpolate: bool = True
+            ):
+        super().__init__(
+            engine,
+            meshes,
+            obj_animation,
+            color=color,
+            program_name=program_name,
+            wireframe=wireframe,
+            gpu_playback=gpu_playback,
+            interpolate=interpolate
+        )
+
+        if texture_path is None: self.texture = None
+        else: self.create_texture(texture_path, texture_repeat, build_mipmaps)
+
+        self.create_vao()
+
+    def create_texture(self,
+            filepath: Union[Path, str],
+            repeat: bool = False,
+            build_mipmaps: bool = False
+            ):
+        """ Load texture through the renderer's texture cache. """
 
-            current_obj = self.frames[self.frame]
-            # Basic model doesn't have multiple meshes
-            mesh = current_obj.meshes[0]
+        # TODO: Detect format
+        self.texture = self.engine.renderer.textures.load(filepath, repeat, build_mipmaps)
 
-            self.vbo.write(self.engine.renderer.to_buffer(mesh.vertices))
-            self.nbo.write(self.engine.renderer.to_buffer(mesh.normals))
-            # UV coordinates will not probably change during animation but
-            # update them as well regardless
-            self.uvbo.write(self.engine.renderer.to_buffer(mesh.uv_coords))
+    def create_vao(self):
+        """ Create VAO. """
+        self.create_vao_from_mesh(self.frames[0].meshes[0])
 
     def render(self):
         """ Render model. """
 
+        self.use_textures()
         if self.texture is not None: self.texture.use(0)
 
         if self.wireframe: self.vao.render(moderngl.LINES)
@@ -483,11 +1167,23 @@ class BasicAnimatedModel(Model):
             texture_repeat: bool = False,
             build_mipmaps: bool = True,
             program_name: Optional[str] = "base",
-            wireframe: bool = False
+            wireframe: bool = False,
+            lazy: bool = False,
+            gpu_playback: bool = False,
+            fps: Optional[float] = None,
+            interpolate: bool = True
             ):
-        """ Create animated model from OBJA file. """
+        """
+        Create animated model from OBJA file.
+
+        If lazy is True, frames are decoded on demand instead of being held
+        by the model, see parse_animation. If
+        gpu_playback is True, all frames are uploaded to the GPU once.
+        fps overrides the frame rate stored in the file.
+        """
         
-        obj_animation = parse_animation(obja_path)
+        obj_animation = parse_animation(obja_path, lazy=lazy)
+        if fps is not None: obj_animation.fps = fps
 
         return cls(
             engine,
@@ -498,11 +1194,13 @@ class BasicAnimatedModel(Model):
             texture_repeat=texture_repeat,
             build_mipmaps=build_mipmaps,
             program_name=program_name,
-            wireframe=wireframe
+            wireframe=wireframe,
+            gpu_playback=gpu_playback,
+            interpolate=interpolate
         )
     
 
-class MultiMaterialAnimatedModel(Model):
+class MultiMaterialAnimatedModel(AnimatedModel):
     """
     Animated model with multiple meshes with different materials.
 
@@ -517,138 +1215,70 @@ class MultiMaterialAnimatedModel(Model):
             texture_repeat: bool = False,
             build_mipmaps: bool = True,
             program_name: Optional[str] = "base",
-            wireframe: bool = False
+            wireframe: bool = False,
+            gpu_playback: bool = False,
+            interpolate: bool = True,
+            texture_array: bool = False
             ):
+        self.texture_array = texture_array
+
         super().__init__(
             engine,
             meshes,
+            obj_animation,
             color=color,
             program_name=program_name,
-            wireframe=wireframe
+            wireframe=wireframe,
+            gpu_playback=gpu_playback,
+            interpolate=interpolate
         )
 
-        self.obj_animation = obj_animation
-        self.frame = 0
-        self.duration = 41
-        self.last_frame = time()
-        self.frame_count = self.obj_animation.frame_count
-        self.frames = self.obj_animation.frames
         self.default_frame = self.frames[0]
-        self.is_playing = False
-        self.loop = False
 
         self.create_textures(texture_repeat, build_mipmaps)
 
         self.create_vao()
 
-    def play(self, loop: bool = False):
-        self.frame = 0
-        self.is_playing = True
-        self.loop = loop
-
-    def stop(self):
-        self.is_playing = False
-
-    def pause(self):
-        self.is_playing = False
-
-    def unpause(self):
-        self.is_playing = True
+    def load_program(self) -> moderngl.Program:
+        """ Get shader program of the model, see AnimatedModel and MultiMaterialModel. """
+        return self.engine.renderer.get_shader(
+            self.program_name,
+            animated=self.gpu_playback,
+            texture_array=self.texture_array
+        )
 
     def create_textures(self, repeat: bool = False, build_mipmaps: bool = True):
-        """ Load and create textures. """
-
-        self.textures = []
+        """ Load textures through the renderer's texture cache. """
 
-        for mesh in self.frames[0].meshes:
-            surface = pygame.image.load(f"assets/textures/headcrab/{mesh.material}")
-            format = "RGB" # TODO: Detect format
+        filepaths = [f"assets/textures/headcrab/{mesh.material}" for mesh in self.frames[0].meshes]
 
-            texture = self.engine.renderer.context.texture(
-                surface.get_size(),
-                len(format),
-                pygame.image.tostring(surface, format, True)
-            )
-
-            texture.repeat_x = repeat
-            texture.repeat_y = repeat
-
-            if build_mipmaps: texture.build_mipmaps()
+        if self.texture_array:
+            self.create_texture_array(self.frames[0].meshes, filepaths, repeat, build_mipmaps)
+            return
 
-            self.textures.append(texture)
+        self.textures = [
+            self.engine.renderer.textures.load(filepath, repeat, build_mipmaps)
+            for filepath in filepaths
+        ]
 
     def create_vao(self):
         """ Create VAO. """
 
-        # Merge all meshes info into single array
-        vertices = []
-        normals = []
-        uv_coords = []
-        for mesh in self.default_frame.meshes: vertices += mesh.vertices
-        for mesh in self.default_frame.meshes: normals += mesh.normals
-        for mesh in self.default_frame.meshes: uv_coords += mesh.uv_coords
+        # Merge all meshes info into single mesh
+        self.create_vao_from_mesh(merge_meshes(self.default_frame.meshes))
 
-        self.vbo = self.engine.renderer.create_bo(vertices)
-        self.nbo = self.engine.renderer.create_bo(normals)
-        self.uvbo = self.engine.renderer.create_bo(uv_coords)
-
-        self.vao = self.engine.renderer.context.vertex_array(
-            self.program,
-            [
-                (self.vbo,  "3f", "in_position"),
-                (self.nbo,  "3f", "in_normal"),
-                (self.uvbo, "2f", "in_uv")
-            ]
-        )
-
-    def update(self,
-            model: glm.mat4,
-            projection: glm.mat4,
-            view: glm.mat4,
-            camera: "Camera",
-            light: "BasicLight"
-        ):
-        """ Update model. """
-        super().update(model, projection, view, camera, light)
-
-        now = time()
-        if self.is_playing and now - self.last_frame > self.duration / 1000:
-            self.last_frame = now
-
-            self.frame += 1
-            if self.frame == self.frame_count:
-                if self.loop: self.frame = 0
-                else: self.frame = self.frame_count - 1
-
-            current_obj = self.frames[self.frame]
-            # Merge all meshes info into single array
-            vertices = []
-            normals = []
-            uv_coords = []
-            for mesh in current_obj.meshes: vertices += mesh.vertices
-            for mesh in current_obj.meshes: normals += mesh.normals
-            #for mesh in current_obj.meshes: uv_coords += mesh.uv_coords
-
-            self.vbo.write(self.engine.renderer.to_buffer(vertices))
-            self.nbo.write(self.engine.renderer.to_buffer(normals))
-            #self.uvbo.write(self.engine.renderer.to_buffer(uv_coords))
+        self.draw_ranges = self.build_draw_ranges(self.default_frame.meshes)
 
     def render(self):
         """ Render model. """
 
-        for i, mesh in enumerate(self.frames[self.frame].meshes):
-            self.textures[i].use(0)
-
-            # Get the starting index for render
-            start = 0
-            for j in range(i):
-                start += len(self.frames[self.frame].meshes[j].vertices) // 3
+        self.use_textures()
 
-            # Get the number of vertices to render
-            verts = len(mesh.vertices) // 3
+        for texture, first, count in self.draw_ranges:
+            texture.use(0)
 
-            if self.wireframe: self.vao.render(moderngl.LINES, vertices=verts, first=start)
-            else: self.vao.render(vertices=verts, first=start)
+            if self.wireframe: self.vao.render(moderngl.LINES, vertices=count, first=first)
+            else: self.vao.render(vertices=count, first=first)
 
     @classmethod
     def from_obja(cls,
@@ -658,11 +1288,26 @@ class MultiMaterialAnimatedModel(Model):
             texture_repeat: bool = False,
             build_mipmaps: bool = True,
             program_name: Optional[str] = "base",
-            wireframe: bool = False
+            wireframe: bool = False,
+            lazy: bool = False,
+            gpu_playback: bool = False,
+            fps: Optional[float] = None,
+            interpolate: bool = True,
+            texture_array: bool = False
             ):
-        """ Create animated model from OBJA file. """
+        """
+        Create animated model from OBJA file.
+
+        If lazy is True, frames are decoded on demand instead of being held
+        by the model, see parse_animation. If
+        gpu_playback is True, all frames are uploaded to the GPU once.
+        fps overrides the frame rate stored in the file. If texture_array
+        is True, textures are packed into a texture array and the whole
+        model is drawn in one call.
+        """
         
-        obj_animation = parse_animation(obja_path)
+        obj_animation = parse_animation(obja_path, lazy=lazy)
+        if fps is not None: obj_animation.fps = fps
 
         return cls(
             engine,
@@ -672,5 +1317,8 @@ class MultiMaterialAnimatedModel(Model):
             texture_repeat=texture_repeat,
             build_mipmaps=build_mipmaps,
             program_name=program_name,
-            wireframe=wireframe
-        )
\ No newline at end of file
+            wireframe=wireframe,
+            gpu_playback=gpu_playback,
+            interpolate=interpolate,
+            texture_array=texture_array
+        )
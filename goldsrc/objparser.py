@@ -6,27 +6,113 @@
 
 """
 
-from typing import Union
+from typing import BinaryIO, Iterator, Optional, Union
 
+import io
 import os
+import struct
 import zipfile
-import shutil
+import threading
+import itertools
+import weakref
+import multiprocessing
+from collections import deque, OrderedDict
+from collections.abc import Hashable, Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass
 
-from .math import flatten_2dlist
+import numpy as np
+
+
+# Increment when parser output changes, invalidates cooked mesh files
+PARSER_VERSION = 3
+
+# Number of floats per interleaved vertex, position, normal and UV coordinates
+VERTEX_SIZE = 8
+
+# Name of the combined OBJ sequence inside OBJA archives, kept as it was
+# when archives were packed through a temporary file
+OBJA_MEMBER = "_temp"
+
+# Name of the binary animation inside OBJA v2 archives
+OBJA2_MEMBER = "animation.bin"
+
+# Frame rate of animations that don't specify one
+DEFAULT_FPS = 24.0
+
+# Number of frames lazy animations decode ahead during playback
+PREFETCH_FRAMES = 4
+
+# Text OBJA sequences smaller than this (in bytes, decompressed) are parsed
+# serially, spawning worker processes costs more than it saves for them
+PARALLEL_MIN_SIZE = 2 * 1024 * 1024
+
+
+def interleave(
+        vertices: np.ndarray,
+        normals: np.ndarray,
+        uv_coords: np.ndarray
+        ) -> np.ndarray:
+    """
+    Interleave vertex attributes into one array.
+
+    @param vertices Positions, flat or shaped (vertices, 3)
+    @param normals Normals, flat or shaped (vertices, 3)
+    @param uv_coords UV coordinates, flat or shaped (vertices, 2)
+    @return Contiguous float32 array shaped (vertices, VERTEX_SIZE)
+    """
+
+    vertices = np.reshape(vertices, (-1, 3))
+
+    data = np.empty((len(vertices), VERTEX_SIZE), dtype=np.float32)
+    data[:, 0:3] = vertices
+    data[:, 3:6] = np.reshape(normals, (-1, 3))
+    data[:, 6:8] = np.reshape(uv_coords, (-1, 2))
+
+    return data
 
 
 @dataclass
 class ObjMesh:
     """
     Mesh with a material specified in the OBJ file.
+
+    Vertex attributes are interleaved into one contiguous float32 array, one
+    row of position, normal and UV coordinates per vertex, so the mesh can
+    be uploaded into a single buffer. If the mesh is indexed, indices is a
+    uint32 array of triangle corners into the rows.
     """
 
     material: str
-    vertices: list[tuple[float, float, float]]
-    normals: list[tuple[float, float, float]]
-    uv_coords: list[tuple[float, float, float]]
+    data: np.ndarray
+    indices: Optional[np.ndarray] = None
+
+    @property
+    def vertices(self) -> np.ndarray:
+        """ Positions shaped (vertices, 3), view into the vertex data. """
+        return self.data[:, 0:3]
+
+    @property
+    def normals(self) -> np.ndarray:
+        """ Normals shaped (vertices, 3), view into the vertex data. """
+        return self.data[:, 3:6]
+
+    @property
+    def uv_coords(self) -> np.ndarray:
+        """ UV coordinates shaped (vertices, 2), view into the vertex data. """
+        return self.data[:, 6:8]
+
+    @property
+    def vertex_count(self) -> int:
+        """ Number of vertices in the mesh. """
+        return len(self.data)
+
+    @property
+    def draw_count(self) -> int:
+        """ Number of vertices (or indices if indexed) to render the mesh. """
+        if self.indices is None: return self.vertex_count
+        return len(self.indices)
 
 
 class Obj:
@@ -49,193 +135,1376 @@ class Obj:
         self.material = material
 
 
+class FrameCache:
+    """
+    Bounded LRU cache of decoded animation frames.
+
+    One cache is shared by all lazy animations, so frames decoded for one
+    model are reused by every other model playing the same animation.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        self.__frames = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def frame_size(frame: Obj) -> int:
+        """ Approximate memory used by decoded frame in bytes. """
+        return sum(mesh.data.nbytes for mesh in frame.meshes)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self.__lock:
+            return key in self.__frames
+
+    def get(self, key: Hashable) -> Optional[Obj]:
+        """ Get cached frame and mark it as recently used. """
+
+        with self.__lock:
+            frame = self.__frames.get(key)
+
+            if frame is None:
+                self.misses += 1
+
+            else:
+                self.hits += 1
+                self.__frames.move_to_end(key)
+
+            return frame
+
+    def put(self, key: Hashable, frame: Obj):
+        """ Cache frame, evicting the least recently used ones if over budget. """
+
+        with self.__lock:
+            if key in self.__frames: return
+
+            self.__frames[key] = frame
+            self.bytes += self.frame_size(frame)
+
+            # Always keep the newest frame even if it alone is over budget
+            while self.bytes > self.max_bytes and len(self.__frames) > 1:
+                _, evicted = self.__frames.popitem(last=False)
+                self.bytes -= self.frame_size(evicted)
+
+    def clear(self):
+        """ Remove all cached frames. """
+
+        with self.__lock:
+            self.__frames.clear()
+            self.bytes = 0
+
+
+# Frame cache shared by all lazy animations
+frame_cache = FrameCache(64 * 1024 * 1024)
+
+# Decodes frames ahead of playback in the background
+_prefetch_executor = None
+
+
+class LazyFrames(Sequence):
+    """
+    Frames of an animation that are decoded on demand.
+
+    Decoded frames live in the shared frame cache, keyed by the animation's
+    source key and frame index.
+    """
+
+    def __init__(self, source: Union["ObjaFrameSource", "Obja2FrameSource"], key: Hashable):
+        self.source = source
+        self.key = key
+
+        self.__pending = set()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.source.frame_count
+
+    def __getitem__(self, frame: int) -> Obj:
+        if frame < 0: frame += len(self)
+        if not 0 <= frame < len(self): raise IndexError("frame index out of range")
+
+        key = (self.key, frame)
+
+        decoded = frame_cache.get(key)
+        if decoded is None:
+            decoded = self.source.decode(frame)
+            frame_cache.put(key, decoded)
+
+        return decoded
+
+    def __prefetched(self, frame: int):
+        try: self[frame]
+
+        finally:
+            with self.__lock:
+                self.__pending.discard(frame)
+
+    def prefetch(self, frame: int, count: int):
+        """ Decode frames [frame, frame + count) in the background, wrapping around. """
+
+        global _prefetch_executor
+
+        for i in range(frame, frame + count):
+            i %= len(self)
+
+            with self.__lock:
+                if i in self.__pending or (self.key, i) in frame_cache: continue
+                self.__pending.add(i)
+
+            if _prefetch_executor is None:
+                _prefetch_executor = ThreadPoolExecutor(1, "frame-prefetch")
+
+            _prefetch_executor.submit(self.__prefetched, i)
+
+
+def _frame_from_data(
+        name: str,
+        material: str,
+        smooth_shading: bool,
+        mesh_table: list[tuple[str, int, int, int, int]],
+        data: np.ndarray,
+        indices: np.ndarray
+        ) -> Obj:
+    """ Create frame with its meshes as views into the frame's vertex data. """
+
+    meshes = []
+    for mesh_name, first, count, first_index, index_count in mesh_table:
+        meshes.append(
+            ObjMesh(
+                mesh_name,
+                data[first:first + count],
+                indices[first_index:first_index + index_count]
+            )
+        )
+
+    return Obj(name, meshes, smooth_shading, material)
+
+
+class PackedFrames(Sequence):
+    """
+    Decoded animation frames packed into contiguous arrays.
+
+    Positions and normals of all frames are stored in a (frames, vertices,
+    6) float32 array. UV coordinates are stored once as a (vertices, 2)
+    array, or per frame as (frames, vertices, 2) only if they change.
+    Topology and material ranges are stored once. Frames are created on
+    access by interleaving their attributes.
+    """
+
+    def __init__(self,
+            name: str,
+            material: str,
+            smooth_shading: bool,
+            mesh_table: list[tuple[str, int, int, int, int]],
+            attributes: np.ndarray,
+            uv_coords: np.ndarray,
+            indices: np.ndarray
+            ):
+        self.name = name
+        self.material = material
+        self.smooth_shading = smooth_shading
+
+        # Material name, first vertex, vertex count, first index, index count
+        self.mesh_table = mesh_table
+
+        self.attributes = attributes
+        self.indices = indices
+
+        # UVs are only kept per frame if they actually change
+        if uv_coords.ndim == 3 and np.all(uv_coords == uv_coords[0]): uv_coords = uv_coords[0]
+        self.uv_coords = np.ascontiguousarray(uv_coords, dtype=np.float32)
+
+    @property
+    def positions(self) -> np.ndarray:
+        """ Positions shaped (frames, vertices, 3), view into the attributes. """
+        return self.attributes[:, :, 0:3]
+
+    @property
+    def normals(self) -> np.ndarray:
+        """ Normals shaped (frames, vertices, 3), view into the attributes. """
+        return self.attributes[:, :, 3:6]
+
+    @property
+    def animated_uvs(self) -> bool:
+        """ Whether UV coordinates are stored per frame. """
+        return self.uv_coords.ndim == 3
+
+    @property
+    def vertex_count(self) -> int:
+        """ Number of vertices of a frame. """
+        return self.attributes.shape[1]
+
+    def frame_data(self, frames: Union[int, slice]) -> np.ndarray:
+        """
+        Interleave attributes of frames into vertex data.
+
+        @param frames Frame index or slice of frames
+        @return Vertex data shaped (vertices, VERTEX_SIZE), or (frames, vertices, VERTEX_SIZE) for a slice
+        """
+
+        attributes = self.attributes[frames]
+
+        if self.animated_uvs: uv_coords = self.uv_coords[frames]
+        else: uv_coords = self.uv_coords
+
+        data = np.empty(attributes.shape[:-1] + (VERTEX_SIZE,), dtype=np.float32)
+        data[..., 0:6] = attributes
+        data[..., 6:8] = uv_coords
+        return data
+
+    def __len__(self) -> int:
+        return len(self.attributes)
+
+    def __getitem__(self, frame: int) -> Obj:
+        if frame < 0: frame += len(self)
+        if not 0 <= frame < len(self): raise IndexError("frame index out of range")
+
+        return _frame_from_data(
+            self.name,
+            self.material,
+            self.smooth_shading,
+            self.mesh_table,
+            self.frame_data(frame),
+            self.indices
+        )
+
+    @classmethod
+    def from_frames(cls, frames: Sequence[Obj]) -> "PackedFrames":
+        """
+        Pack frames that are indexed with the same topology.
+
+        @param frames Frames to pack
+        @return Packed frames
+        """
+
+        if len(frames) == 0: raise ValueError("animation has no frames")
+
+        meshes = frames[0].meshes
+
+        for frame in frames:
+            if len(frame.meshes) != len(meshes) or any(
+                mesh.indices is None or
+                mesh.vertex_count != first_mesh.vertex_count or
+                not np.array_equal(mesh.indices, first_mesh.indices)
+                for mesh, first_mesh in zip(frame.meshes, meshes)
+                ):
+                raise ValueError("animation frames must be indexed with the same topology")
+
+        mesh_table = []
+        first = 0
+        first_index = 0
+        for mesh in meshes:
+            mesh_table.append((mesh.material, first, mesh.vertex_count, first_index, len(mesh.indices)))
+            first += mesh.vertex_count
+            first_index += len(mesh.indices)
+
+        data = np.stack([
+            np.concatenate([mesh.data for mesh in frame.meshes])
+            for frame in frames
+        ]).astype(np.float32, copy=False)
+
+        return cls(
+            frames[0].name,
+            frames[0].material,
+            frames[0].smooth_shading,
+            mesh_table,
+            np.ascontiguousarray(data[:, :, 0:6]),
+            data[:, :, 6:8],
+            np.concatenate([mesh.indices for mesh in meshes]).astype(np.uint32, copy=False)
+        )
+
+
 class ObjAnimation:
     """
     Sequence of Wavefront OBJ animation frames.
+
+    Frames are either packed into a contiguous array or lazy frames that are
+    decoded on demand, see parse_animation. A list of frames indexed with
+    the same topology is packed on creation.
     """
 
-    def __init__(self, frames: list[Obj]):
+    def __init__(self, frames: Sequence[Obj], fps: float = DEFAULT_FPS):
+        if not isinstance(frames, (PackedFrames, LazyFrames)):
+            frames = PackedFrames.from_frames(frames)
+
         self.frames = frames
         self.frame_count = len(self.frames)
+        self.fps = fps
+
+    @property
+    def lazy(self) -> bool:
+        """ Whether frames are decoded on demand. """
+        return isinstance(self.frames, LazyFrames)
+
+    def frame_data(self, frame: int) -> np.ndarray:
+        """
+        Get interleaved vertex data of all meshes of a frame.
+
+        @param frame Frame index
+        @return Vertex data shaped (vertices, VERTEX_SIZE)
+        """
+
+        if not self.lazy: return self.frames.frame_data(frame)
 
+        return np.concatenate([mesh.data for mesh in self.frames[frame].meshes])
 
-def parse_raw(obj_content: str) -> Obj:
+    def prefetch(self, frame: int, count: int = PREFETCH_FRAMES):
+        """ Decode upcoming frames ahead of playback if the animation is lazy. """
+        if self.lazy: self.frames.prefetch(frame, count)
+
+    def position_range(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get minimum and maximum vertex positions over all frames.
+
+        Lazy animations are not decoded, the range is taken from the stored frames.
+        """
+
+        if self.lazy: return self.frames.source.position_range()
+
+        positions = self.frames.positions
+        return positions.min(axis=(0, 1)), positions.max(axis=(0, 1))
+
+
+def _to_array(lines: list[str], components: int, dtype: type) -> np.ndarray:
     """
-    Parse Wavefront OBJ string.
+    Convert lines of whitespace separated numbers into a 2D array in bulk.
 
-    Doesn't support quad faces yet. If you are exporting from Blender, you
-    have to turn "Triangulate faces" option on.
+    Extra components (like the optional W of vertices) are dropped.
+    """
 
-    @param obj_content String containing OBJ content
-    @return Parsed OBJ model
+    if len(lines) == 0:
+        return np.zeros((0, components), dtype=dtype)
+
+    tokens = " ".join(lines).split()
+    array = np.array(tokens, dtype=dtype)
+
+    if array.size == len(lines) * components:
+        return array.reshape(-1, components)
+
+    # Lines have varying or additional components, convert them one by one
+    return np.array([line.split()[:components] for line in lines], dtype=dtype)
+
+
+def unique_rows(rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
     """
+    Deduplicate rows of a 2D array.
 
-    name = ""
-    material = ""
+    Unique rows are ordered by their first occurrence, so when the rows are
+    face corners the vertex order follows the face order and stays friendly
+    to the post-transform cache.
 
-    vertices = []
-    uv_coords = []
-    normals = []
+    @param rows 2D array, face corners for example
+    @return Position of each unique row's first occurrence and uint32 index of each row into the unique rows
+    """
 
-    # Mesh groups separated by material name
-    groups = {}
-    current_group = ""
+    _, first, inverse = np.unique(
+        rows,
+        axis=0,
+        return_index=True,
+        return_inverse=True
+    )
 
-    smooth_shading = False
+    order = np.argsort(first)
+    remap = np.empty_like(order)
+    remap[order] = np.arange(len(order))
 
-    for line in obj_content.split("\n"):
-        line = line.split()
+    return first[order], remap[inverse.reshape(-1)].astype(np.uint32)
 
-        # Skip empty line
-        if len(line) == 0: continue
 
-        # Object name
-        # o name
-        elif line[0] == "o":
-            name = line[1]
+def index_frames(frames: list[Obj]) -> PackedFrames:
+    """
+    Index non-indexed animation frames with a topology shared by all frames.
 
-        # Object material
-        # mtllib material
-        elif line[0] == "mtllib":
-            material = line[1]
+    A corner can only share a vertex with another corner if their attributes
+    are equal in every frame, so that one index buffer fits all frames.
 
-        # Mesh material
-        # usemtl material
-        elif line[0] == "usemtl":
-            current_group = line[1]
-            groups[current_group] = {
-                "vertex_indices": [],
-                "normal_indices": [],
-                "uv_indices": []
-            }
+    @param frames Non-indexed frames with the same face layout
+    @return Indexed frames packed into a contiguous array
+    """
+
+    if len(frames) == 0: raise ValueError("animation has no frames")
+
+    for frame in frames:
+        if len(frame.meshes) != len(frames[0].meshes) or any(
+            mesh.vertex_count != first_mesh.vertex_count
+            for mesh, first_mesh in zip(frame.meshes, frames[0].meshes)
+            ):
+            raise ValueError("animation frames must share the same face layout")
+
+    mesh_table = []
+    firsts = []
+    indices = []
+    vertex_count = 0
+    index_count = 0
+
+    for i, mesh in enumerate(frames[0].meshes):
+        # One row per corner with its attributes in all frames side by side
+        rows = np.hstack([frame.meshes[i].data for frame in frames])
+
+        first, mesh_indices = unique_rows(rows)
+
+        mesh_table.append((mesh.material, vertex_count, len(first), index_count, len(mesh_indices)))
+        firsts.append(first)
+        indices.append(mesh_indices)
+        vertex_count += len(first)
+        index_count += len(mesh_indices)
+
+    attributes = np.empty((len(frames), vertex_count, 6), dtype=np.float32)
+    uv_coords = np.empty((len(frames), vertex_count, 2), dtype=np.float32)
+
+    # Gather unique corners of every frame straight into the packed arrays
+    for i, frame in enumerate(frames):
+        for mesh, first, (_, start, count, _, _) in zip(frame.meshes, firsts, mesh_table):
+            corners = mesh.data[first]
+            attributes[i, start:start + count] = corners[:, 0:6]
+            uv_coords[i, start:start + count] = corners[:, 6:8]
+
+    if len(indices) > 0: indices = np.concatenate(indices)
+    else: indices = np.zeros(0, dtype=np.uint32)
+
+    return PackedFrames(
+        frames[0].name,
+        frames[0].material,
+        frames[0].smooth_shading,
+        mesh_table,
+        attributes,
+        uv_coords,
+        indices
+    )
+
+
+def merge_meshes(meshes: list[ObjMesh]) -> ObjMesh:
+    """
+    Merge meshes into one mesh, in order.
+
+    If any of the meshes is indexed, the merged mesh is indexed too and
+    indices are offset to point into the merged vertex arrays.
+    """
+
+    if len(meshes) == 1: return meshes[0]
+
+    indexed = any(mesh.indices is not None for mesh in meshes)
+
+    indices = []
+    base = 0
+    for mesh in meshes:
+        if indexed:
+            if mesh.indices is None:
+                local = np.arange(mesh.vertex_count, dtype=np.uint32)
+            else:
+                local = mesh.indices
+
+            indices.append(local + np.uint32(base))
+
+        base += mesh.vertex_count
+
+    return ObjMesh(
+        "",
+        np.concatenate([mesh.data for mesh in meshes]),
+        np.concatenate(indices) if indexed else None
+    )
+
+
+class ObjBuilder:
+    """
+    Incremental Wavefront OBJ parser.
+
+    Lines are fed one by one and only sorted by their type while reading.
+    Numbers are converted in bulk, every CHUNK_LINES lines of a kind, so the
+    text of the file never has to be held in memory as a whole.
+    """
+
+    # Number of pending lines of a kind before they are converted to arrays
+    CHUNK_LINES = 65536
+
+    def __init__(self):
+        self.name = ""
+        self.material = ""
+        self.smooth_shading = False
+
+        # Vertex attribute pools, converted chunks and pending lines
+        self.__vertices = ([], [])
+        self.__uv_coords = ([], [])
+        self.__normals = ([], [])
+
+        # Face corners grouped by material name, converted chunks and pending lines
+        self.__groups = {}
+        self.__current_group = ""
+
+    @property
+    def has_faces(self) -> bool:
+        """ Whether any face has been fed since the last reset. """
+        return any(
+            len(chunks) > 0 or len(lines) > 0
+            for chunks, lines in self.__groups.values()
+        )
+
+    @staticmethod
+    def __flush_attribute(pool: tuple[list, list], components: int):
+        chunks, lines = pool
+        if len(lines) > 0:
+            chunks.append(_to_array(lines, components, np.float32))
+            lines.clear()
+
+    @staticmethod
+    def __flush_faces(group: tuple[list, list]):
+        chunks, lines = group
+        if len(lines) > 0:
+            # Every face corner is a v/vt/vn index triplet
+            corners = " ".join(lines).split()
+            joined = " ".join(corners)
+
+            # Other corner forms (v, v/vt, v//vn) would silently regroup into wrong triplets
+            if (
+                "//" in joined or "/ " in joined or " /" in joined
+                or joined.startswith("/") or joined.endswith("/")
+                or any(count != 2 for count in map(str.count, corners, itertools.repeat("/")))
+            ):
+                for corner in corners:
+                    fields = corner.split("/")
+                    if len(fields) != 3 or not all(fields):
+                        raise ValueError(
+                            f"unsupported face corner '{corner}', only v/vt/vn corners are supported"
+                        )
+
+            faces = joined.replace("/", " ").split()
+            chunks.append(np.array(faces, dtype=np.int64).reshape(-1, 3) - 1)
+            lines.clear()
+
+    @staticmethod
+    def __concatenate(pool: tuple[list, list], components: int) -> np.ndarray:
+        chunks = pool[0]
+        if len(chunks) == 0: return np.zeros((0, components), dtype=np.float32)
+        if len(chunks) > 1: chunks[:] = [np.concatenate(chunks)]
+        return chunks[0]
+
+    def feed(self, line: str):
+        """ Feed one line of OBJ content. """
+
+        line = line.strip()
+
+        # Skip empty line and comments
+        if len(line) == 0 or line[0] == "#": return
+
+        # Fields can be separated by any whitespace
+        if "\t" in line: line = line.replace("\t", " ")
+
+        keyword, _, data = line.partition(" ")
 
         # Vertices
         # v x y z
-        elif line[0] == "v":
-            vertices.append([float(line[1]), float(line[2]), float(line[3])])
+        if keyword == "v":
+            self.__vertices[1].append(data)
+            if len(self.__vertices[1]) >= self.CHUNK_LINES:
+                self.__flush_attribute(self.__vertices, 3)
 
         # UV (texture) coordinates
         # vt x y
-        elif line[0] == "vt":
-            uv_coords.append([float(line[1]), float(line[2])])
+        elif keyword == "vt":
+            self.__uv_coords[1].append(data)
+            if len(self.__uv_coords[1]) >= self.CHUNK_LINES:
+                self.__flush_attribute(self.__uv_coords, 2)
 
         # Normals
         # vn x y z
-        elif line[0] == "vn":
-            normals.append([float(line[1]), float(line[2]), float(line[3])])
+        elif keyword == "vn":
+            self.__normals[1].append(data)
+            if len(self.__normals[1]) >= self.CHUNK_LINES:
+                self.__flush_attribute(self.__normals, 3)
 
         # Face triangles
-        # f triangle
-        elif line[0] == "f":
-            for d in line[1:]:
-                h = d.split("/")
-                groups[current_group]["vertex_indices"].append(int(h[0]) - 1)
-                groups[current_group]["uv_indices"].append(int(h[1]) - 1)
-                groups[current_group]["normal_indices"].append(int(h[2]) - 1)
+        # f v/vt/vn v/vt/vn v/vt/vn
+        elif keyword == "f":
+            group = self.__groups.setdefault(self.__current_group, ([], []))
+            group[1].append(data)
+            if len(group[1]) >= self.CHUNK_LINES:
+                self.__flush_faces(group)
+
+        # Object name
+        # o name
+        elif keyword == "o":
+            self.name = data.strip()
+
+        # Object material
+        # mtllib material
+        elif keyword == "mtllib":
+            self.material = data.strip()
+
+        # Mesh material
+        # usemtl material
+        elif keyword == "usemtl":
+            self.__current_group = data.strip()
+            self.__groups[self.__current_group] = ([], [])
 
         # Smooth shading
         # s 1/0  or  s on/off
-        elif line[0] == "s":
-            if line[1] in ("on", "1"):
-                smooth_shading = True
-            else:
-                smooth_shading = False
+        elif keyword == "s":
+            self.smooth_shading = data.strip() in ("on", "1")
 
-    meshes = []
+    def build(self, index: bool = True) -> Obj:
+        """
+        Build OBJ model from the lines fed so far.
 
-    # Create meshes from face and material info
-    for group in groups:
-        meshes.append(
-            ObjMesh(
-                group,
-                flatten_2dlist([vertices[i] for i in groups[group]["vertex_indices"]]),
-                flatten_2dlist([normals[i] for i in groups[group]["normal_indices"]]),
-                flatten_2dlist([uv_coords[i] for i in groups[group]["uv_indices"]])
+        Face attributes are gathered by index into interleaved vertex data.
+        If index is True, corners sharing the same v/vt/vn triplet are stored
+        once and meshes are drawn through their indices.
+
+        @param index Deduplicate corners and create indexed meshes
+        @return Parsed OBJ model
+        """
+
+        self.__flush_attribute(self.__vertices, 3)
+        self.__flush_attribute(self.__uv_coords, 2)
+        self.__flush_attribute(self.__normals, 3)
+
+        vertices = self.__concatenate(self.__vertices, 3)
+        uv_coords = self.__concatenate(self.__uv_coords, 2)
+        normals = self.__concatenate(self.__normals, 3)
+
+        meshes = []
+
+        # Create meshes from face and material info
+        for group_name, group in self.__groups.items():
+            self.__flush_faces(group)
+
+            if len(group[0]) > 0: corners = np.concatenate(group[0])
+            else: corners = np.zeros((0, 3), dtype=np.int64)
+
+            if index:
+                first, indices = unique_rows(corners)
+                unique = corners[first]
+
+            else:
+                unique, indices = corners, None
+
+            meshes.append(
+                ObjMesh(
+                    group_name,
+                    interleave(
+                        vertices[unique[:, 0]],
+                        normals[unique[:, 2]],
+                        uv_coords[unique[:, 1]]
+                    ),
+                    indices
+                )
             )
+
+        return Obj(
+            self.name,
+            meshes,
+            self.smooth_shading,
+            self.material
         )
 
-    return Obj(
-        name,
-        meshes,
-        smooth_shading,
-        material
-    )
+    def reset_faces(self):
+        """
+        Forget faces fed so far but keep the vertex attribute pools.
 
+        OBJ indices are global to the file, so objects that come later can
+        still refer to the attributes of previous objects.
+        """
 
-def parse(filepath: Union[Path, str]) -> Obj:
+        self.__groups.clear()
+        self.__current_group = ""
+
+
+def parse_raw(obj_content: str, index: bool = True) -> Obj:
+    """
+    Parse Wavefront OBJ string.
+
+    Doesn't support quad faces yet. If you are exporting from Blender, you
+    have to turn "Triangulate faces" option on.
+
+    @param obj_content String containing OBJ content
+    @param index Deduplicate corners and create indexed meshes
+    @return Parsed OBJ model
+    """
+
+    builder = ObjBuilder()
+
+    for line in obj_content.splitlines():
+        builder.feed(line)
+
+    return builder.build(index)
+
+
+def parse(filepath: Union[Path, str], index: bool = True) -> Obj:
     """ 
     Parse Wavefront OBJ file.
 
     Doesn't support quad faces yet. If you are exporting from Blender, you
     have to turn "Triangulate faces" option on.
 
+    The file is read line by line instead of being loaded as a whole.
+
     @param filepath Path to the OBJ file
+    @param index Deduplicate corners and create indexed meshes
     @return Parsed OBJ model
     """
 
+    builder = ObjBuilder()
+
     with open(filepath, "r") as obj_file:
-        content = obj_file.read()
+        for line in obj_file:
+            builder.feed(line)
+
+    return builder.build(index)
+
+
+def iter_objects(filepath: Union[Path, str], index: bool = True) -> Iterator[Obj]:
+    """
+    Read Wavefront OBJ file incrementally and yield its objects one by one.
+
+    Each object ("o" statement) is yielded as soon as the next one starts or
+    the file ends. Text is never held in memory as a whole, only the vertex
+    attribute pools are kept as compact arrays because OBJ indices are global
+    to the file.
+
+    @param filepath Path to the OBJ file
+    @param index Deduplicate corners and create indexed meshes
+    @return Iterator of parsed objects
+    """
+
+    builder = ObjBuilder()
+
+    with open(filepath, "r") as obj_file:
+        for line in obj_file:
+            if line.startswith("o ") and builder.has_faces:
+                yield builder.build(index)
+                builder.reset_faces()
+
+            builder.feed(line)
+
+    if builder.has_faces:
+        yield builder.build(index)
+
+
+def iter_animation(filepath: Union[Path, str, BinaryIO]) -> Iterator[Obj]:
+    """
+    Read OBJ animation file incrementally and yield its frames one by one.
+
+    The archive is decompressed in memory as a stream and each frame is
+    parsed as soon as the next one starts, so only one frame is held in
+    memory at a time. Nothing is written to disk, so any number of
+    animations can be read concurrently. Frames are not indexed, see
+    index_frames.
+
+    @param filepath Path to the animation file or binary file object of it
+    @return Iterator of parsed frames
+    """
+
+    with zipfile.ZipFile(filepath, "r") as zip:
+        if OBJA2_MEMBER in zip.namelist():
+            raise ValueError("OBJA v2 archives can't be streamed, use parse_animation")
+
+        with zip.open(zip.namelist()[0], "r") as member:
+            obja_file = io.TextIOWrapper(member, encoding="utf-8")
+
+            builder = ObjBuilder()
+            for line in obja_file:
+                if line.startswith("# frame"):
+                    if builder.has_faces:
+                        yield builder.build(index=False)
+
+                    builder = ObjBuilder()
+
+                else:
+                    builder.feed(line)
+
+            if builder.has_faces:
+                yield builder.build(index=False)
+
+
+def _parse_frame(content: str) -> Obj:
+    """ Parse one non-indexed animation frame, in a worker process. """
+    return parse_raw(content, index=False)
+
+
+def _iter_frames_parallel(
+        member: BinaryIO,
+        workers: int
+        ) -> Iterator[Obj]:
+    """
+    Parse frames of a text OBJA sequence across worker processes.
+
+    Frame texts are submitted as they are read and only a few of them are in
+    flight per worker, so memory stays bounded. Frames come back as NumPy
+    arrays, which are pickled as compact raw buffers.
+
+    Workers are spawned instead of forked, the loading process usually has a
+    window and GL context open already. Frozen builds have to call
+    multiprocessing.freeze_support() at startup.
+    """
+
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(workers, mp_context=context) as executor:
+        pending = deque()
+
+        def submit(lines: list[str]):
+            if len(lines) > 0:
+                pending.append(executor.submit(_parse_frame, "".join(lines)))
+
+        lines = []
+        for line in io.TextIOWrapper(member, encoding="utf-8"):
+            if line.startswith("# frame"):
+                submit(lines)
+                lines = []
+
+                while len(pending) > workers * 2:
+                    frame = pending.popleft().result()
+                    if len(frame.meshes) > 0: yield frame
+
+            else:
+                lines.append(line)
+
+        submit(lines)
+
+        while len(pending) > 0:
+            frame = pending.popleft().result()
+            if len(frame.meshes) > 0: yield frame
+
+
+class ObjaFrameSource:
+    """
+    Random access frame decoder over a text (v1) OBJA archive.
+
+    The archive is scanned once for the byte offsets of its frames, frames
+    are parsed from their offset when decoded. Frames are not indexed, every
+    mesh is drawn through sequential indices, so all frames share the same
+    topology without parsing all of them up front.
+    """
+
+    # Number of vertex lines converted at once while scanning
+    CHUNK_LINES = 65536
+
+    def __init__(self, archive: Union[Path, str, bytes]):
+        # Path or contents of the archive, it's opened again for every decode
+        self.__archive = archive
+
+        self.fps = DEFAULT_FPS
+
+        # Byte offsets of frames (after their markers) in the archive member
+        self.offsets = []
+
+        # Position range of all frames, vertex lines are converted in chunks
+        minimum = np.full(3, np.inf, dtype=np.float32)
+        maximum = np.full(3, -np.inf, dtype=np.float32)
+        vertices = []
+
+        def flush_vertices():
+            nonlocal minimum, maximum
+            if len(vertices) > 0:
+                positions = _to_array(vertices, 3, np.float32)
+                minimum = np.minimum(minimum, positions.min(axis=0))
+                maximum = np.maximum(maximum, positions.max(axis=0))
+                vertices.clear()
+
+        with self.__zip() as zip, zip.open(zip.namelist()[0], "r") as member:
+            offset = 0
+            start = 0
+            has_faces = False
+
+            for line in member:
+                offset += len(line)
+
+                if line.startswith(b"# frame"):
+                    # Frames without faces are skipped, like iter_animation does
+                    if has_faces: self.offsets.append(start)
+                    start = offset
+                    has_faces = False
+
+                elif line[:2] in (b"f ", b"f\t"):
+                    has_faces = True
+
+                elif line[:2] in (b"v ", b"v\t"):
+                    vertices.append(line[2:].decode("utf-8"))
+                    if len(vertices) >= self.CHUNK_LINES: flush_vertices()
+
+            if has_faces: self.offsets.append(start)
+
+        flush_vertices()
+
+        if len(self.offsets) == 0: raise ValueError("animation has no frames")
+
+        self.frame_count = len(self.offsets)
+        self.__range = (minimum, maximum)
+
+        first = self.__parse(0)
+        self.name = first.name
+        self.material = first.material
+        self.smooth_shading = first.smooth_shading
+
+        self.mesh_table = []
+        vertex_count = 0
+        for mesh in first.meshes:
+            self.mesh_table.append((mesh.material, vertex_count, mesh.vertex_count, vertex_count, mesh.vertex_count))
+            vertex_count += mesh.vertex_count
+
+        self.vertex_count = vertex_count
+
+        # Sequential indices local to each mesh
+        self.indices = np.concatenate([
+            np.arange(mesh.vertex_count, dtype=np.uint32) for mesh in first.meshes
+        ]) if len(first.meshes) > 0 else np.zeros(0, dtype=np.uint32)
+
+    def __zip(self) -> zipfile.ZipFile:
+        if isinstance(self.__archive, bytes): return zipfile.ZipFile(io.BytesIO(self.__archive), "r")
+        return zipfile.ZipFile(self.__archive, "r")
+
+    def __parse(self, frame: int) -> Obj:
+        builder = ObjBuilder()
+
+        with self.__zip() as zip, zip.open(zip.namelist()[0], "r") as member:
+            # Seeking forward in a compressed member decompresses up to the offset
+            member.seek(self.offsets[frame])
+
+            for line in io.TextIOWrapper(member, encoding="utf-8"):
+                if line.startswith("# frame"): break
+                builder.feed(line)
+
+        return builder.build(index=False)
+
+    def position_range(self) -> tuple[np.ndarray, np.ndarray]:
+        """ Get minimum and maximum vertex positions over all frames, gathered while scanning. """
+        return self.__range
+
+    def decode(self, frame: int) -> Obj:
+        """ Parse one frame into float32 meshes. """
+
+        parsed = self.__parse(frame)
+
+        if len(parsed.meshes) != len(self.mesh_table) or any(
+            mesh.vertex_count != count
+            for mesh, (_, _, count, _, _) in zip(parsed.meshes, self.mesh_table)
+            ):
+            raise ValueError("animation frames must share the same face layout")
+
+        return _frame_from_data(
+            self.name,
+            self.material,
+            self.smooth_shading,
+            self.mesh_table,
+            np.concatenate([mesh.data for mesh in parsed.meshes]),
+            self.indices
+        )
+
+
+# Sources of lazy animations by file, shared while any animation uses them
+_lazy_sources = weakref.WeakValueDictionary()
 
-    return parse_raw(content)
-        
+# Keys for lazy animations not loaded from a path
+_source_keys = itertools.count()
 
-def parse_animation(filepath: Union[Path, str]) -> ObjAnimation:
+
+def parse_animation(
+        filepath: Union[Path, str, BinaryIO],
+        workers: Optional[int] = None,
+        lazy: bool = False
+        ) -> ObjAnimation:
     """
     Parse OBJ animation file.
 
-    @param filepath Path to the animation file.
+    Both text (v1) and binary (v2) OBJA archives are supported. Frames of
+    large text sequences are parsed in parallel across worker processes,
+    small ones are parsed serially.
+
+    Lazy animations decode frames on demand into the shared frame cache.
+    They keep only the compact stored frames of a v2 archive, or only the
+    frame offsets of a text archive, whose frames are parsed from the
+    archive when decoded. Animations of the same file share the stored
+    frames and the decoded ones.
+
+    @param filepath Path to the animation file or binary file object of it
+    @param workers Number of worker processes, CPU count if None and serial if 1
+    @param lazy Decode frames on demand
     @return Parsed ObjAnimation
     """
 
-    os.mkdir("_temp")
+    if workers is None: workers = os.cpu_count() or 1
+
+    if lazy and isinstance(filepath, (Path, str)):
+        stat = os.stat(filepath)
+        key = (str(Path(filepath).resolve()), stat.st_mtime_ns, stat.st_size)
+
+        source = _lazy_sources.get(key)
+        if source is not None:
+            return ObjAnimation(LazyFrames(source, key), source.fps)
+
+    else:
+        key = ("<stream>", next(_source_keys))
 
     with zipfile.ZipFile(filepath, "r") as zip:
-        zip.extractall("_temp")
+        if OBJA2_MEMBER in zip.namelist():
+            if lazy:
+                source = Obja2FrameSource(zip.read(OBJA2_MEMBER))
+                _lazy_sources[key] = source
+                return ObjAnimation(LazyFrames(source, key), source.fps)
+
+            return unpack_animation(zip.read(OBJA2_MEMBER))
 
-    with open("_temp/_temp", "r") as obja_file:
-        content = obja_file.read()
+        info = zip.infolist()[0]
 
-    frames = []
-    for frame in content.split("# frame\n"):
-        # Skip empty lines
-        if len(frame.strip()) > 0:
-            frames.append(parse_raw(frame))
+        if workers > 1 and info.file_size >= PARALLEL_MIN_SIZE:
+            with zip.open(info, "r") as member:
+                frames = list(_iter_frames_parallel(member, workers))
 
-    shutil.rmtree("_temp")
+            return ObjAnimation(index_frames(frames))
 
-    return ObjAnimation(frames)
+    if not isinstance(filepath, (Path, str)): filepath.seek(0)
+
+    if lazy:
+        if isinstance(filepath, (Path, str)): source = ObjaFrameSource(filepath)
+        else: source = ObjaFrameSource(filepath.read())
+
+        _lazy_sources[key] = source
+        return ObjAnimation(LazyFrames(source, key), source.fps)
+
+    return ObjAnimation(index_frames(list(iter_animation(filepath))))
 
 
 def pack_animation_sequence(
         dir: Union[Path, str],
-        out_path: Union[Path, str],
+        out_path: Union[Path, str, BinaryIO],
         compression: int = zipfile.ZIP_DEFLATED
         ):
     """
     Pack and compress sequence of OBJ files into one file.
 
+    OBJ files are expected to be named with their frame number at the end
+    (like Blender exports them, untitled_000001.obj) and are packed in frame
+    order. They are streamed straight into the archive.
+
     @param dir Directory of OBJ files
-    @param out Output file path
+    @param out Output file path or binary file object
     @param compression Compression method
     """
 
     dir = Path(dir)
 
-    # Combine all OBJ files
-    with open("_temp", "a") as out:
-        for *_, files in os.walk(dir):
-            for name in files:
-                if name.endswith(".obj"):
-                    frame = int(name.replace(".obj", "").split("_")[-1])
-                    
-                    with open(dir / name, "r") as obj:
-                        obj_content = obj.read()
-
-                    out.write(f"# frame\n")
-                    out.write(obj_content)
+    files = sorted(
+        dir.glob("*.obj"),
+        key=lambda path: int(path.stem.split("_")[-1])
+    )
 
-    # Compress the combined OBJ sequence
+    # Combine all OBJ files into the compressed OBJ sequence
     with zipfile.ZipFile(out_path, "w", compression) as zip:
-        zip.write("_temp")
+        with zip.open(OBJA_MEMBER, "w") as member:
+            out = io.TextIOWrapper(member, encoding="utf-8")
+
+            for path in files:
+                out.write(f"# frame\n")
+
+                with open(path, "r") as obj:
+                    line = "\n"
+                    for line in obj: out.write(line)
+
+                    # Next frame marker has to start on its own line
+                    if not line.endswith("\n"): out.write("\n")
+
+            out.flush()
+            out.detach()
+
+
+# OBJA v2 layout
+#
+#   Header
+#   Object name & material library strings
+#   Mesh table              (one entry per mesh)
+#   UV coordinates          (float32, stored once or per frame if they change)
+#   Indices                 (uint32, stored once, local to each mesh)
+#   Position bounds         (only if quantized, min & extent float32 vec3s)
+#   Positions               (per frame, float32 or uint16)
+#   Normals                 (per frame, float32 or int16)
+#
+# Topology and UVs are shared by all frames. Quantized positions are mapped
+# into the bounds of the whole animation and normals are stored as signed
+# normalized integers. With delta encoding every frame after the first one
+# stores the wrapping difference to the previous frame in quantized space,
+# which compresses a lot better. All values are little-endian.
+
+OBJA2_MAGIC = b"GOA2"
+OBJA2_VERSION = 1
+
+# magic, version, flags, fps, frame count, vertex count, index count, mesh count
+OBJA2_HEADER = struct.Struct("<4sHHfIIII")
+
+# name length, first vertex, vertex count, first index, index count
+OBJA2_MESH = struct.Struct("<HIIII")
+
+# string length
+OBJA2_STRING = struct.Struct("<H")
+
+OBJA2_QUANTIZED = 1 << 0
+OBJA2_DELTA = 1 << 1
+OBJA2_SMOOTH_SHADING = 1 << 2
+OBJA2_ANIMATED_UVS = 1 << 3
+
+
+def pack_animation(
+        animation: ObjAnimation,
+        out_path: Union[Path, str, BinaryIO],
+        quantize: bool = True,
+        delta: bool = True,
+        compression: int = zipfile.ZIP_DEFLATED
+        ):
+    """
+    Pack animation into binary OBJA v2 file.
+
+    All frames must be indexed with the same topology, like the frames
+    parse_animation returns.
+
+    @param animation Animation to pack
+    @param out_path Output file path or binary file object
+    @param quantize Store positions and normals as 16-bit integers
+    @param delta Store differences between frames, requires quantize
+    @param compression Compression method
+    """
+
+    if delta and not quantize:
+        raise ValueError("delta encoding requires quantization")
+
+    frames = animation.frames
+    if not isinstance(frames, PackedFrames): frames = PackedFrames.from_frames(frames)
+
+    # UVs are only stored for every frame if they actually change
+    uv_coords = frames.uv_coords
+    animated_uvs = frames.animated_uvs
+
+    flags = 0
+    if quantize: flags |= OBJA2_QUANTIZED
+    if delta: flags |= OBJA2_DELTA
+    if frames.smooth_shading: flags |= OBJA2_SMOOTH_SHADING
+    if animated_uvs: flags |= OBJA2_ANIMATED_UVS
+
+    data = io.BytesIO()
+
+    data.write(OBJA2_HEADER.pack(
+        OBJA2_MAGIC,
+        OBJA2_VERSION,
+        flags,
+        animation.fps,
+        len(frames),
+        frames.vertex_count,
+        len(frames.indices),
+        len(frames.mesh_table)
+    ))
+
+    for string in (frames.name, frames.material):
+        string = string.encode("utf-8")
+        data.write(OBJA2_STRING.pack(len(string)) + string)
+
+    for mesh_name, *mesh_range in frames.mesh_table:
+        name = mesh_name.encode("utf-8")
+        data.write(OBJA2_MESH.pack(len(name), *mesh_range) + name)
+
+    data.write(uv_coords.astype("<f4").tobytes())
+    data.write(frames.indices.astype("<u4").tobytes())
+
+    positions = frames.positions
+    normals = frames.normals
+
+    if quantize:
+        low = positions.min(axis=(0, 1))
+        extent = positions.max(axis=(0, 1)) - low
+        extent[extent == 0.0] = 1.0
+
+        data.write(low.astype("<f4").tobytes())
+        data.write(extent.astype("<f4").tobytes())
+
+        positions = np.round((positions - low) / extent * 65535.0).astype("<u2")
+        normals = np.round(np.clip(normals, -1.0, 1.0) * 32767.0).astype("<i2")
+
+        if delta:
+            positions[1:] = np.diff(positions, axis=0)
+            normals[1:] = np.diff(normals, axis=0)
+
+    else:
+        positions = positions.astype("<f4")
+        normals = normals.astype("<f4")
+
+    data.write(positions.tobytes())
+    data.write(normals.tobytes())
+
+    with zipfile.ZipFile(out_path, "w", compression) as archive:
+        archive.writestr(OBJA2_MEMBER, data.getvalue())
+
+
+class Obja2FrameSource:
+    """
+    Random access frame decoder over OBJA v2 data.
+
+    Frames are kept in their compact stored form (16-bit integers if the
+    animation is quantized, deltas already resolved) and only expanded into
+    float32 meshes when decoded.
+    """
+
+    def __init__(self, data: bytes):
+        magic, version, flags, fps, frame_count, vertex_count, index_count, mesh_count = \
+            OBJA2_HEADER.unpack_from(data, 0)
+
+        if magic != OBJA2_MAGIC or version != OBJA2_VERSION:
+            raise ValueError("not an OBJA v2 animation or unsupported version")
+
+        self.fps = fps
+        self.frame_count = frame_count
+        self.vertex_count = vertex_count
+        self.flags = flags
+
+        offset = OBJA2_HEADER.size
+
+        strings = []
+        for _ in range(2):
+            length, = OBJA2_STRING.unpack_from(data, offset)
+            offset += OBJA2_STRING.size
+            strings.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+
+        self.name, self.material = strings
+
+        self.mesh_table = []
+        for _ in range(mesh_count):
+            length, *mesh_range = OBJA2_MESH.unpack_from(data, offset)
+            offset += OBJA2_MESH.size
+            self.mesh_table.append((data[offset:offset + length].decode("utf-8"), *mesh_range))
+            offset += length
+
+        def read(dtype: str, count: int) -> np.ndarray:
+            nonlocal offset
+            array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes
+            return array
+
+        if flags & OBJA2_ANIMATED_UVS:
+            self.uv_coords = read("<f4", frame_count * vertex_count * 2).reshape(frame_count, vertex_count, 2)
+        else:
+            self.uv_coords = read("<f4", vertex_count * 2).reshape(1, vertex_count, 2)
+
+        self.uv_coords = self.uv_coords.astype(np.float32)
+        self.indices = read("<u4", index_count).astype(np.uint32)
+
+        if flags & OBJA2_QUANTIZED:
+            self.low = read("<f4", 3).astype(np.float32)
+            self.extent = read("<f4", 3).astype(np.float32)
+
+            positions = read("<u2", frame_count * vertex_count * 3).reshape(frame_count, vertex_count, 3)
+            normals = read("<i2", frame_count * vertex_count * 3).reshape(frame_count, vertex_count, 3)
+
+            if flags & OBJA2_DELTA:
+                # Integer sums wrap around exactly like the encoding did
+                positions = np.cumsum(positions, axis=0, dtype=np.uint16)
+                normals = np.cumsum(normals, axis=0, dtype=np.int16)
+
+        else:
+            positions = read("<f4", frame_count * vertex_count * 3).reshape(frame_count, vertex_count, 3)
+            normals = read("<f4", frame_count * vertex_count * 3).reshape(frame_count, vertex_count, 3)
+
+        self.positions = positions.astype(positions.dtype.newbyteorder("="))
+        self.normals = normals.astype(normals.dtype.newbyteorder("="))
+
+    def decode_attributes(self, frames: Union[int, slice]) -> np.ndarray:
+        """ Expand stored positions and normals of frames into float32 (..., 6) arrays. """
+
+        positions = self.positions[frames]
+        normals = self.normals[frames]
+
+        if self.flags & OBJA2_QUANTIZED:
+            positions = positions * (self.extent / 65535.0) + self.low
+            normals = normals / 32767.0
+
+        attributes = np.empty(positions.shape[:-1] + (6,), dtype=np.float32)
+        attributes[..., 0:3] = positions
+        attributes[..., 3:6] = normals
+
+        return attributes
+
+    def decode_data(self, frames: Union[int, slice]) -> np.ndarray:
+        """ Expand stored frames into interleaved float32 vertex data. """
+
+        attributes = self.decode_attributes(frames)
+
+        if self.flags & OBJA2_ANIMATED_UVS: uv_coords = self.uv_coords[frames]
+        elif isinstance(frames, slice): uv_coords = self.uv_coords
+        else: uv_coords = self.uv_coords[0]
+
+        data = np.empty(attributes.shape[:-1] + (VERTEX_SIZE,), dtype=np.float32)
+        data[..., 0:6] = attributes
+        data[..., 6:8] = uv_coords
+
+        return data
+
+    def position_range(self) -> tuple[np.ndarray, np.ndarray]:
+        """ Get minimum and maximum vertex positions over all frames. """
+
+        minimum = self.positions.min(axis=(0, 1)).astype(np.float32)
+        maximum = self.positions.max(axis=(0, 1)).astype(np.float32)
+
+        if self.flags & OBJA2_QUANTIZED:
+            minimum = minimum * (self.extent / 65535.0) + self.low
+            maximum = maximum * (self.extent / 65535.0) + self.low
+
+        return minimum, maximum
+
+    def decode(self, frame: int) -> Obj:
+        """ Decode one frame into float32 meshes. """
+
+        return _frame_from_data(
+            self.name,
+            self.material,
+            bool(self.flags & OBJA2_SMOOTH_SHADING),
+            self.mesh_table,
+            self.decode_data(frame),
+            self.indices
+        )
+
+
+def unpack_animation(data: bytes) -> ObjAnimation:
+    """
+    Unpack binary OBJA v2 animation data.
+
+    @param data Decompressed OBJA v2 data
+    @return Parsed ObjAnimation
+    """
+
+    source = Obja2FrameSource(data)
+
+    frames = PackedFrames(
+        source.name,
+        source.material,
+        bool(source.flags & OBJA2_SMOOTH_SHADING),
+        source.mesh_table,
+        source.decode_attributes(slice(None)),
+        source.uv_coords if source.flags & OBJA2_ANIMATED_UVS else source.uv_coords[0],
+        source.indices
+    )
+
+    return ObjAnimation(frames, source.fps)
+
+
+def convert_animation(
+        obja_path: Union[Path, str, BinaryIO],
+        out_path: Union[Path, str, BinaryIO],
+        quantize: bool = True,
+        delta: bool = True,
+        fps: float = DEFAULT_FPS,
+        compression: int = zipfile.ZIP_DEFLATED
+        ):
+    """
+    Convert OBJA file packed with pack_animation_sequence into OBJA v2.
+
+    @param obja_path Path to the OBJA file
+    @param out_path Output file path or binary file object
+    @param quantize Store positions and normals as 16-bit integers
+    @param delta Store differences between frames, requires quantize
+    @param fps Frame rate of the animation
+    @param compression Compression method
+    """
+
+    animation = parse_animation(obja_path)
+    animation.fps = fps
 
-    os.remove("_temp")
\ No newline at end of file
+    pack_animation(animation, out_path, quantize, delta, compression)
@@ -0,0 +1,166 @@
+"""
+
+    GoldSrc Python
+    MIT © Kadir Aksoy
+    https://github.com/kadir014/goldsrc-python
+
+"""
+
+from typing import Optional, TYPE_CHECKING
+
+from collections.abc import Iterable
+
+import moderngl
+import numpy as np
+
+if TYPE_CHECKING:
+    from .renderer import Renderer
+    from .entity import Entity
+    from .camera import Camera
+
+
+# Entities with smaller bounding spheres are not queried, their query would
+# cost about as much as drawing them
+DEFAULT_MIN_RADIUS = 0.5
+
+# Proxy boxes are enlarged by this fraction of the bounding sphere radius,
+# so they aren't hidden by the entity's own faces lying on the box
+PROXY_MARGIN = 0.02
+
+# Unit cube proxy, corners and triangles
+PROXY_VERTICES = np.array((
+    (0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (1.0, 1.0, 0.0), (0.0, 1.0, 0.0),
+    (0.0, 0.0, 1.0), (1.0, 0.0, 1.0), (1.0, 1.0, 1.0), (0.0, 1.0, 1.0)
+), dtype=np.float32)
+
+PROXY_INDICES = np.array((
+    0, 2, 1,  0, 3, 2,
+    4, 5, 6,  4, 6, 7,
+    0, 1, 5,  0, 5, 4,
+    3, 6, 2,  3, 7, 6,
+    0, 4, 7,  0, 7, 3,
+    1, 2, 6,  1, 6, 5
+), dtype=np.uint32)
+
+
+class OcclusionCuller:
+    """
+    Occlusion culling with GPU occlusion queries.
+
+    After the visible entities are drawn, the bounding box of every entity
+    that passed frustum culling is drawn inside an occlusion query, with
+    color and depth writes disabled. Results are read at the start of the
+    next frame, when the GPU is (almost always) done with them, so reading
+    them doesn't stall. Entities whose box had no samples pass the depth
+    test are hidden for that frame.
+
+    Because results are one frame old, an entity coming out from behind an
+    occluder is drawn one frame late. Entities the camera is inside of and
+    entities smaller than min_radius are not queried and always drawn.
+    """
+
+    def __init__(self, renderer: "Renderer", min_radius: float = DEFAULT_MIN_RADIUS):
+        self.renderer = renderer
+        self.min_radius = min_radius
+
+        # Query objects can't be released, they are reused every frame
+        self.__queries: list[moderngl.Query] = []
+
+        # Entities queried in the last frame, in query order
+        self.__pending: list["Entity"] = []
+
+        # Entities hidden according to the last results
+        self.__hidden: set["Entity"] = set()
+
+        # Number of queries issued in the last frame
+        self.queried = 0
+
+        self.__program: Optional[moderngl.Program] = None
+        self.__vao: Optional[moderngl.VertexArray] = None
+
+    def resolve(self):
+        """ Read results of the queries issued in the last frame. """
+
+        self.__hidden = set()
+        for entity, query in zip(self.__pending, self.__queries):
+            if query.samples == 0: self.__hidden.add(entity)
+
+        self.__pending = []
+
+    def is_hidden(self, entity: "Entity") -> bool:
+        """ Whether the entity was occluded in the last frame. """
+        return entity in self.__hidden
+
+    def query(self, entities: Iterable["Entity"], camera: "Camera"):
+        """
+        Issue occlusion queries of entities against the current depth buffer.
+
+        Must be called after the visible entities are drawn and before
+        anything that shouldn't occlude (UI, post-processing) is drawn.
+
+        @param entities Entities that passed frustum culling, including hidden ones
+        @param camera Camera the frame is rendered from
+        """
+
+        if self.__vao is None: self.__create_proxy()
+
+        uniforms = self.renderer.uniforms(self.__program)
+
+        framebuffer = self.renderer.context.fbo
+        color_mask = framebuffer.color_mask
+        depth_mask = framebuffer.depth_mask
+        framebuffer.color_mask = (False, False, False, False)
+        framebuffer.depth_mask = False
+
+        # Masks are applied when the framebuffer is bound
+        framebuffer.use()
+
+        try:
+            for entity in entities:
+                world_bounds = entity.world_bounds()
+                if world_bounds is None: continue
+
+                _, radius, minimum, maximum = world_bounds
+                if radius < self.min_radius: continue
+
+                margin = radius * PROXY_MARGIN
+                minimum = minimum - margin
+                maximum = maximum + margin
+
+                # Near plane would clip the box if the camera is (almost) inside it
+                if all(minimum[i] - camera.near <= camera.position[i] <= maximum[i] + camera.near for i in range(3)):
+                    continue
+
+                if len(self.__pending) == len(self.__queries):
+                    self.__queries.append(self.renderer.context.query(samples=True))
+
+                uniforms.set("u_box_min", minimum)
+                uniforms.set("u_box_max", maximum)
+
+                with self.__queries[len(self.__pending)]: self.__vao.render()
+
+                self.__pending.append(entity)
+
+        finally:
+            framebuffer.color_mask = color_mask
+            framebuffer.depth_mask = depth_mask
+            framebuffer.use()
+
+        self.queried = len(self.__pending)
+
+    def clear(self):
+        """ Forget pending queries and results, e.g. when the scene changes. """
+        self.__pending = []
+        self.__hidden = set()
+        self.queried = 0
+
+    def __create_proxy(self):
+        context = self.renderer.context
+
+        self.__program = self.renderer.get_shader("occlusion")
+
+        self.__vao = context.vertex_array(
+            self.__program,
+            [(context.buffer(PROXY_VERTICES), "3f", "in_position")],
+            context.buffer(PROXY_INDICES)
+        )
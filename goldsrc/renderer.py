@@ -6,7 +6,7 @@
 
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional, Union
 
 import sys
 import struct
@@ -15,12 +15,51 @@ from contextlib import contextmanager
 
 import pygame
 import moderngl
+import numpy as np
 
 from .path import source_path
 from .ui import Container, Widget
+from .meshregistry import MeshRegistry
+from .texturecache import TextureCache
+from .uniforms import UniformCache, UniformStats
+from .occlusion import OcclusionCuller
 
 if TYPE_CHECKING:
     from .engine import Engine
+    from .camera import Camera
+    from .light import BasicLight
+
+
+# Interleaved vertex layout of meshes, shader attribute and float count
+VERTEX_LAYOUT = (
+    ("in_position", 3),
+    ("in_normal", 3),
+    ("in_uv", 2)
+)
+
+# Per-instance layout of instance buffers, shader attribute and float count
+INSTANCE_LAYOUT = (
+    ("in_instance_model", 16),
+    ("in_instance_color", 4),
+    ("in_instance_normal", 9)
+)
+
+# Per-vertex layout of texture array layer buffers, shader attribute and float count
+LAYER_LAYOUT = (
+    ("in_layer", 1),
+)
+
+# Per-frame uniform block (see shaders/frame.glsl) and its binding point
+FRAME_BLOCK_NAME = "Frame"
+FRAME_BLOCK_BINDING = 0
+
+# std140 layout of the frame block after the projection and view matrices
+#   view position, ambient intensity
+#   light position, diffuse intensity
+#   light color, specular intensity
+#   specular power, padded to 16 bytes
+FRAME_BLOCK_LIGHTING = struct.Struct("<3ff3ff3fff12x")
+FRAME_BLOCK_SIZE = 128 + FRAME_BLOCK_LIGHTING.size
 
 
 class Renderer:
@@ -34,6 +73,19 @@ class Renderer:
         # Cached shader programs
         self.__programs = {}
 
+        # Uniform caches of shader programs and their write counts
+        self.__uniform_caches = {}
+        self.uniform_stats = UniformStats()
+
+        # Meshes shared by models
+        self.meshes = MeshRegistry(self)
+
+        # Textures shared by models
+        self.textures = TextureCache(self)
+
+        # Occlusion queries, only used if the engine's occlusion culling is enabled
+        self.occlusion = OcclusionCuller(self)
+
         # Temporary context is used to get the multi-sampling limit
         tempcontext = moderngl.create_standalone_context()
         self.max_samples = tempcontext.max_samples
@@ -64,6 +116,10 @@ class Renderer:
         self.context.enable(moderngl.BLEND | moderngl.DEPTH_TEST)
         self.context.multisample = True
 
+        # Per-frame camera and light data shared by all model programs
+        self.frame_ubo = self.context.buffer(reserve=FRAME_BLOCK_SIZE)
+        self.frame_ubo.bind_to_uniform_block(FRAME_BLOCK_BINDING)
+
         # Game framebuffer
         # It doesn't have multisampling for post-process effects
         game_fbo_color = self.context.texture(
@@ -184,75 +240,203 @@ class Renderer:
         """ Clear active framebuffer. """
         self.context.clear(*self.clear_color)
 
-    def to_buffer(self, array: list) -> bytes:
-        """ Convert array to ModernGL compatible buffer form. """
+    def to_buffer(self, array: Union[list, np.ndarray]) -> Union[bytes, np.ndarray]:
+        """
+        Convert array to ModernGL compatible buffer form.
+
+        NumPy arrays are passed through without copying if they are already
+        contiguous float32 or uint32 arrays.
+        """
+
+        if isinstance(array, np.ndarray):
+            dtype = np.float32 if array.dtype.kind == "f" else np.uint32
+            return np.ascontiguousarray(array, dtype=dtype)
+
         dtype = "f" if isinstance(array[0], float) else "I"
         return struct.pack(f"{len(array)}{dtype}", *array)
 
-    def create_bo(self, array: list) -> moderngl.Buffer:
+    def create_bo(self, array: Union[list, np.ndarray]) -> moderngl.Buffer:
         """ Create buffer object from array. """
         return self.context.buffer(self.to_buffer(array))
     
+    def create_vao(self,
+            program: moderngl.Program,
+            vbo: Optional[moderngl.Buffer],
+            ibo: Optional[moderngl.Buffer] = None,
+            instance_buffer: Optional[moderngl.Buffer] = None,
+            layer_buffer: Optional[moderngl.Buffer] = None
+            ) -> moderngl.VertexArray:
+        """
+        Create VAO of an interleaved vertex buffer.
+
+        Attributes the program doesn't use (or the driver optimized out) are
+        skipped over in the buffer layout.
+
+        @param program Shader program
+        @param vbo Buffer of interleaved vertex data, see objparser.interleave, None if the shader fetches vertices itself
+        @param ibo Optional index buffer
+        @param instance_buffer Optional buffer of per-instance data, see INSTANCE_LAYOUT
+        @param layer_buffer Optional buffer of per-vertex texture array layers, see LAYER_LAYOUT
+        @return Vertex array object
+        """
+
+        def describe(buffer: moderngl.Buffer, layout: tuple, divisor: str = "") -> tuple:
+            formats = []
+            attributes = []
+            for attribute, components in layout:
+                if program.get(attribute, None) is None:
+                    formats.append(f"{components * 4}x")
+
+                else:
+                    formats.append(f"{components}f")
+                    attributes.append(attribute)
+
+            return (buffer, " ".join(formats) + divisor, *attributes)
+
+        content = []
+        if vbo is not None:
+            content.append(describe(vbo, VERTEX_LAYOUT))
+        if instance_buffer is not None:
+            content.append(describe(instance_buffer, INSTANCE_LAYOUT, "/i"))
+        if layer_buffer is not None:
+            content.append(describe(layer_buffer, LAYER_LAYOUT))
+
+        return self.context.vertex_array(program, content, ibo)
+
     def get_shader(self, 
             shader: str,
-            force: bool = False
+            force: bool = False,
+            animated: bool = False,
+            instanced: bool = False,
+            texture_array: bool = False
             ) -> moderngl.Program:
         """
         This function caches shader programs which can be used commonly for future use.
-        If it can't be used commonly it creates a new instance and returns it.
+        Per-model state like color is not stored in the programs, models set it before rendering.
 
         @param force Force compile all common shader programs
+        @param animated Get the variant that fetches vertices from a frames texture
+        @param instanced Get the variant that takes model matrix and color per instance
+        @param texture_array Get the variant that samples a texture array by per-vertex layer
         @return Shader program
         """
 
         # Common shader programs
         if len(self.__programs) == 0 or force:
             self.__programs.clear()
+            self.__uniform_caches.clear()
 
-            self.__programs["base"] = self.context.program(
-                vertex_shader = open(source_path("goldsrc", "shaders", "base.vsh")).read(),
-                fragment_shader = open(source_path("goldsrc", "shaders", "base.fsh")).read()
-            )
+            self.__programs["base"] = self.__create_program("base.vsh", "base.fsh")
 
-            self.__programs["unlit"] = self.context.program(
-                vertex_shader = open(source_path("goldsrc", "shaders", "base.vsh")).read(),
-                fragment_shader = open(source_path("goldsrc", "shaders", "unlit.fsh")).read()
-            )
+            self.__programs["unlit"] = self.__create_program("base.vsh", "unlit.fsh")
 
-            self.__programs["normal"] = self.context.program(
-                vertex_shader = open(source_path("goldsrc", "shaders", "normal.vsh")).read(),
-                fragment_shader = open(source_path("goldsrc", "shaders", "normal.fsh")).read()
-            )
+            self.__programs["normal"] = self.__create_program("normal.vsh", "normal.fsh")
 
-            self.__programs["skybox"] = self.context.program(
-                vertex_shader = open(source_path("goldsrc", "shaders", "skybox.vsh")).read(),
-                fragment_shader = open(source_path("goldsrc", "shaders", "skybox.fsh")).read()
-            )
+            self.__programs["skybox"] = self.__create_program("skybox.vsh", "skybox.fsh")
 
-            self.__programs["ui"] = self.context.program(
-                vertex_shader = open(source_path("goldsrc", "shaders", "ui.vsh")).read(),
-                fragment_shader = open(source_path("goldsrc", "shaders", "ui.fsh")).read()
-            )
+            self.__programs["ui"] = self.__create_program("ui.vsh", "ui.fsh")
 
-            self.__programs["gaussian_blur"] = self.context.program(
-                vertex_shader = open(source_path("goldsrc", "shaders", "ui.vsh")).read(),
-                fragment_shader = open(source_path("goldsrc", "shaders", "gaussian_blur.fsh")).read()
-            )
+            self.__programs["gaussian_blur"] = self.__create_program("ui.vsh", "gaussian_blur.fsh")
 
-        # Non common shader programs
-        if shader == "flat":
-            return self.context.program(
-                vertex_shader = open(source_path("goldsrc", "shaders", "base.vsh")).read(),
-                fragment_shader = open(source_path("goldsrc", "shaders", "flat.fsh")).read()
-            )
-        
-        elif shader == "unlitflat":
-            return self.context.program(
-                vertex_shader = open(source_path("goldsrc", "shaders", "base.vsh")).read(),
-                fragment_shader = open(source_path("goldsrc", "shaders", "unlitflat.fsh")).read()
-            )
+            # Color of flat shaders is set by each model before rendering
+            self.__programs["flat"] = self.__create_program("base.vsh", "flat.fsh")
+
+            self.__programs["unlitflat"] = self.__create_program("base.vsh", "unlitflat.fsh")
+
+            # Bounding box proxies of occlusion queries
+            self.__programs["occlusion"] = self.__create_program("occlusion.vsh", "occlusion.fsh")
+
+        if not (animated or instanced or texture_array): return self.__programs[shader]
+
+        # Variants of model shader programs
+        # Color of instanced variants comes from the instance buffer so flat shaders are common too
+        name = shader
+        if animated: name += "_animated"
+        if instanced: name += "_instanced"
+        if texture_array: name += "_array"
+
+        if name in self.__programs: return self.__programs[name]
+
+        defines = []
+        if instanced: defines.append("INSTANCED")
+        if texture_array: defines.append("TEXTURE_ARRAY")
 
-        return self.__programs[shader]
+        if animated: vertex_shader = "animated.vsh"
+        elif instanced: vertex_shader = "instanced.vsh"
+        else: vertex_shader = "base.vsh"
+
+        self.__programs[name] = self.__create_program(vertex_shader, f"{shader}.fsh", *defines)
+
+        return self.__programs[name]
+
+    def uniforms(self, program: moderngl.Program) -> UniformCache:
+        """ Get uniform cache of shader program, shared by all of its users. """
+
+        cache = self.__uniform_caches.get(program.glo)
+
+        if cache is None:
+            cache = UniformCache(program, self.uniform_stats)
+            self.__uniform_caches[program.glo] = cache
+
+        return cache
+
+    def __create_program(self, vertex_shader: str, fragment_shader: str, *defines: str) -> moderngl.Program:
+        """ Create shader program from shader files, binding the frame block if it's used. """
+
+        program = self.context.program(
+            vertex_shader = self.__read_shader(vertex_shader, *defines),
+            fragment_shader = self.__read_shader(fragment_shader, *defines)
+        )
+
+        block = program.get(FRAME_BLOCK_NAME, None)
+        if block is not None: block.binding = FRAME_BLOCK_BINDING
+
+        return program
+
+    def __read_shader(self, filename: str, *defines: str) -> str:
+        """
+        Read shader source.
+
+        Defines are inserted after the version directive and #include "file"
+        lines are replaced with the contents of the file.
+        """
+
+        source = open(source_path("goldsrc", "shaders", filename)).read()
+
+        lines = []
+        for line in source.split("\n"):
+            if line.startswith("#include"):
+                lines.append(self.__read_shader(line.split('"')[1]))
+            else:
+                lines.append(line)
+
+        source = "\n".join(lines)
+        if len(defines) == 0: return source
+
+        version, _, body = source.partition("\n")
+        return "\n".join((version, *(f"#define {define}" for define in defines), body))
+
+    def update_frame(self, camera: "Camera", light: "BasicLight"):
+        """
+        Write per-frame camera and light data into the frame uniform block.
+
+        Called once per frame before models are rendered, models only set
+        their own uniforms like the model matrix.
+        """
+
+        self.frame_ubo.write(
+            camera.projection.to_bytes() +
+            camera.get_view_matrix().to_bytes() +
+            FRAME_BLOCK_LIGHTING.pack(
+                *camera.position,
+                light.ambient_intensity,
+                *light.position,
+                light.diffuse_intensity,
+                *light.color,
+                light.specular_intensity,
+                light.specular_power
+            )
+        )
     
     def setup_postprocess(self):
         """ Setup postprocess. """
@@ -267,7 +451,7 @@ class Renderer:
     def setup_debug_ui(self):
         """ Setup debug UI."""
         
-        self.debug_ui = Widget(self.ui, (0, 0), (305, 155))
+        self.debug_ui = Widget(self.ui, (0, 0), (305, 219))
 
         self.debug_ui_font = pygame.font.Font(source_path("assets", "fonts", "FiraCode.ttf"), 12)
         self.debug_ui_font.set_bold(True)
@@ -503,6 +687,119 @@ class Renderer:
             version_color
         )
 
+        # Draw texture cache stats
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            "Textures",
+            (5, 5 + y_gap * 9),
+            label_color
+        )
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            f"{self.textures.hits}/{self.textures.misses}",
+            (row_start + row_gap * 0, 5 + y_gap * 9),
+            min_color
+        )
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            f"{round(self.textures.nbytes / 1048576, 1)} MB",
+            (row_start + row_gap * 2, 5 + y_gap * 9),
+            avg_color
+        )
+
+        # Draw uniform write stats of the last frame
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            "Uniforms",
+            (5, 5 + y_gap * 10),
+            label_color
+        )
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            str(self.uniform_stats.last_issued),
+            (row_start + row_gap * 0, 5 + y_gap * 10),
+            max_color
+        )
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            str(self.uniform_stats.last_skipped),
+            (row_start + row_gap * 1, 5 + y_gap * 10),
+            min_color
+        )
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            "set/skip",
+            (row_start + row_gap * 2, 5 + y_gap * 10),
+            label_color
+        )
+
+        # Draw culling stats of the last frame
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            "Entities",
+            (5, 5 + y_gap * 11),
+            label_color
+        )
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            str(self.engine.drawn_entities),
+            (row_start + row_gap * 0, 5 + y_gap * 11),
+            min_color
+        )
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            str(self.engine.culled_entities),
+            (row_start + row_gap * 1, 5 + y_gap * 11),
+            max_color
+        )
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            "drawn/culled",
+            (row_start + row_gap * 2, 5 + y_gap * 11),
+            label_color
+        )
+
+        # Draw occlusion culling stats of the last frame
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            "Occlusion",
+            (5, 5 + y_gap * 12),
+            label_color
+        )
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            str(self.engine.occluded_entities),
+            (row_start + row_gap * 0, 5 + y_gap * 12),
+            max_color
+        )
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            str(self.occlusion.queried),
+            (row_start + row_gap * 1, 5 + y_gap * 12),
+            min_color
+        )
+        self.draw_shadow_text(
+            self.debug_ui.surface,
+            self.debug_ui_font,
+            "hid/query",
+            (row_start + row_gap * 2, 5 + y_gap * 12),
+            label_color
+        )
+
         # Update debug UI texture
         self.debug_ui.update_texture()
 
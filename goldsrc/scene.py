@@ -8,6 +8,9 @@
 
 from typing import TYPE_CHECKING
 
+from .spatial import SpatialIndex
+from .batching import StaticGeometry, DEFAULT_CHUNK_SIZE
+
 if TYPE_CHECKING:
     from .engine import Engine
     from .entity import Entity
@@ -33,9 +36,47 @@ class Scene:
         self.entities = []
         self.light = None
 
+        # Spatial index of entities, shared by culling, collision and gameplay queries
+        self.spatial = SpatialIndex()
+
+        # Merged geometry of static entities, see build_static
+        self.static_geometry = StaticGeometry(engine)
+
     def add_entity(self, entity: "Entity"):
         """ Add model to the scene. """
         self.entities.append(entity)
+        self.spatial.insert(entity)
+
+    def remove_entity(self, entity: "Entity"):
+        """
+        Remove model from the scene.
+
+        Removing a baked entity rebuilds the static geometry without it.
+        """
+
+        self.entities.remove(entity)
+        self.spatial.remove(entity)
+
+        if entity.baked: self.static_geometry.build(self.entities)
+
+    def build_static(self, chunk_size: float = DEFAULT_CHUNK_SIZE):
+        """
+        Bake static entities into merged world space buffers.
+
+        Call after the static entities are added and placed, static entities
+        added later are not baked until this is called again. Moving a baked
+        entity has no visible effect until this is called again either, its
+        triangles stay where they were baked.
+
+        @param chunk_size Edge length of the grid cells geometry is split into for culling
+        """
+
+        self.static_geometry.chunk_size = chunk_size
+        self.static_geometry.build(self.entities)
+
+    def colliding(self, entity: "Entity") -> list["Entity"]:
+        """ Get entities colliding with the entity, using the spatial index as broad phase. """
+        return [other for other in self.spatial.query_entity(entity) if entity.collide(other)]
 
     def update(self):
         """ Scene update callback. """
@@ -0,0 +1,17 @@
+// Per-frame camera and light data shared by all model programs
+// Written once per frame by the renderer, see Renderer.update_frame
+layout(std140) uniform Frame {
+    mat4 u_projection;
+    mat4 u_view;
+
+    vec3 u_view_position;
+    float u_ambient_intensity;
+
+    vec3 u_light_position;
+    float u_diffuse_intensity;
+
+    vec3 u_light_color;
+    float u_specular_intensity;
+
+    float u_specular_power;
+};
\ No newline at end of file
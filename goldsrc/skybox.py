@@ -10,11 +10,6 @@ from typing import Union, TYPE_CHECKING
 
 from pathlib import Path
 
-import pygame
-
-from .factory import create_cube_mesh
-from .math import flatten_mat
-
 if TYPE_CHECKING:
     from .engine import Engine
     from .camera import Camera
@@ -32,12 +27,8 @@ class Skybox:
             ):
         self.engine = engine
 
-        cube = create_cube_mesh(1.0)
-        self.vertices = cube[0]
-        self.normals = cube[1]
-        self.uv_coords = cube[2]
-
         self.program = self.engine.renderer.get_shader("skybox")
+        self.uniforms = self.engine.renderer.uniforms(self.program)
 
         # Top =    +Y
         # Bottom = -Y
@@ -57,36 +48,33 @@ class Skybox:
 
         for side in texture_paths:
             if side.lower() in ("top", "+y", "y+", "posy", "ypos"):
-                textures["top"] = pygame.image.load(texture_paths[side])
+                textures["top"] = texture_paths[side]
 
             elif side.lower() in ("bottom", "-y", "y-", "negy", "yneg"):
-                textures["bottom"] = pygame.image.load(texture_paths[side])
+                textures["bottom"] = texture_paths[side]
 
             elif side.lower() in ("left", "-x", "x-", "negx", "xneg"):
-                textures["left"] = pygame.image.load(texture_paths[side])
+                textures["left"] = texture_paths[side]
 
             elif side.lower() in ("right", "+x", "x+", "posx", "xpos"):
-                textures["right"] = pygame.image.load(texture_paths[side])
+                textures["right"] = texture_paths[side]
 
             elif side.lower() in ("front", "-z", "z-", "negz", "zneg"):
-                textures["front"] = pygame.image.load(texture_paths[side])
+                textures["front"] = texture_paths[side]
 
             elif side.lower() in ("back", "+z", "z+", "posz", "zpos"):
-                textures["back"] = pygame.image.load(texture_paths[side])
-
-        combined = pygame.image.tostring(textures["right"], "RGB", flip_textures) +  \
-                   pygame.image.tostring(textures["left"], "RGB", flip_textures) +   \
-                   pygame.image.tostring(textures["top"], "RGB", flip_textures) +    \
-                   pygame.image.tostring(textures["bottom"], "RGB", flip_textures) + \
-                   pygame.image.tostring(textures["back"], "RGB", flip_textures) +   \
-                   pygame.image.tostring(textures["front"], "RGB", flip_textures)
-        
-        size = textures["top"].get_width()
-
-        self.cubemap = self.engine.renderer.context.texture_cube(
-            (size, size),
-            3,
-            combined
+                textures["back"] = texture_paths[side]
+
+        self.cubemap = self.engine.renderer.textures.load_cube(
+            (
+                textures["right"],
+                textures["left"],
+                textures["top"],
+                textures["bottom"],
+                textures["back"],
+                textures["front"]
+            ),
+            flip_textures
         )
 
         self.create_vao()
@@ -94,18 +82,8 @@ class Skybox:
     def create_vao(self):
         """ Create VAO (Vertex Array Object) """
 
-        self.vbo = self.engine.renderer.create_bo(self.vertices)
-        self.nbo = self.engine.renderer.create_bo(self.normals)
-        self.uvbo = self.engine.renderer.create_bo(self.uv_coords)
-
-        self.vao = self.engine.renderer.context.vertex_array(
-            self.program,
-            [
-                (self.vbo,  "3f", "in_position"),
-                (self.nbo,  "3f", "in_normal"),
-                (self.uvbo, "2f", "in_uv")
-            ]
-        )
+        self.shared_mesh = self.engine.renderer.meshes.load_cube(1.0)
+        self.vao = self.shared_mesh.vao(self.program)
 
     def update(self, camera: "Camera"):
         """ Update matrix uniforms """
@@ -119,8 +97,8 @@ class Skybox:
         view[3][1] = 0
         view[3][2] = 0
 
-        self.program["u_projection"].value = flatten_mat(projection)
-        self.program["u_view"].value = flatten_mat(view)
+        self.uniforms.set("u_projection", projection)
+        self.uniforms.set("u_view", view)
 
     def render(self):
         """ Render skybox VAO """
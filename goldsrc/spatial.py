@@ -0,0 +1,439 @@
+"""
+
+    GoldSrc Python
+    MIT © Kadir Aksoy
+    https://github.com/kadir014/goldsrc-python
+
+"""
+
+from typing import Optional, TYPE_CHECKING
+
+from math import inf
+
+import glm
+
+from .bounds import Frustum
+
+if TYPE_CHECKING:
+    from .entity import Entity
+
+
+# Default distance leaf boxes are enlarged by on every side
+DEFAULT_MARGIN = 0.25
+
+
+class SpatialNode:
+    """
+    Node of the spatial index tree.
+
+    Leaves hold one entity, internal nodes always have two children and
+    their box encloses the boxes of both children.
+    """
+
+    def __init__(self, minimum: glm.vec3, maximum: glm.vec3, entity: Optional["Entity"] = None):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.entity = entity
+
+        self.parent = None
+        self.left = None
+        self.right = None
+
+        # Leaves have height 0
+        self.height = 0
+
+        # Leaf entity has no bounds of its own and is always visible
+        self.unbounded = False
+
+    @property
+    def is_leaf(self) -> bool:
+        return self.left is None
+
+
+def _surface_area(minimum: glm.vec3, maximum: glm.vec3) -> float:
+    d = maximum - minimum
+    return 2.0 * (d.x * d.y + d.y * d.z + d.z * d.x)
+
+
+def _contains(node: SpatialNode, minimum: glm.vec3, maximum: glm.vec3) -> bool:
+    return node.minimum.x <= minimum.x and node.minimum.y <= minimum.y and node.minimum.z <= minimum.z and \
+           node.maximum.x >= maximum.x and node.maximum.y >= maximum.y and node.maximum.z >= maximum.z
+
+
+def _overlaps(node: SpatialNode, minimum: glm.vec3, maximum: glm.vec3) -> bool:
+    return node.minimum.x <= maximum.x and node.maximum.x >= minimum.x and \
+           node.minimum.y <= maximum.y and node.maximum.y >= minimum.y and \
+           node.minimum.z <= maximum.z and node.maximum.z >= minimum.z
+
+
+class SpatialIndex:
+    """
+    Dynamic AABB tree (bounding volume hierarchy) of scene entities.
+
+    Every entity is a leaf with its world space AABB enlarged by a margin,
+    so small movements don't change the tree. When an entity leaves its
+    enlarged box it's reinserted, and only the boxes on its path to the root
+    are refit. Insertion picks the sibling with the surface area heuristic
+    and the tree is kept balanced with rotations, so queries visit
+    O(log n) nodes.
+
+    Entities without bounds (no model bounds nor collider) are located by
+    their position and always reported visible by frustum queries, like
+    they are when culling without the index.
+
+    Movement is detected by calling update once per frame, which compares
+    each entity's bounds against its leaf.
+    """
+
+    def __init__(self, margin: float = DEFAULT_MARGIN):
+        self.margin = margin
+
+        self.root = None
+
+        self.__leaves = {}
+        self.__unbounded = {}
+
+    def __len__(self) -> int:
+        return len(self.__leaves)
+
+    def __contains__(self, entity: "Entity") -> bool:
+        return entity in self.__leaves
+
+    @property
+    def height(self) -> int:
+        """ Height of the tree, 0 if it has one leaf or is empty. """
+        return 0 if self.root is None else self.root.height
+
+    def insert(self, entity: "Entity"):
+        """ Add entity to the index. """
+
+        if entity in self.__leaves: return
+
+        minimum, maximum, unbounded = self.__entity_box(entity)
+
+        leaf = SpatialNode(minimum - self.margin, maximum + self.margin, entity)
+        leaf.unbounded = unbounded
+
+        self.__leaves[entity] = leaf
+        if unbounded: self.__unbounded[entity] = None
+
+        self.__insert_leaf(leaf)
+
+    def remove(self, entity: "Entity"):
+        """ Remove entity from the index. """
+
+        leaf = self.__leaves.pop(entity, None)
+        if leaf is None: return
+
+        self.__unbounded.pop(entity, None)
+        self.__remove_leaf(leaf)
+
+    def update(self, entity: Optional["Entity"] = None) -> int:
+        """
+        Move entities that left their leaf boxes.
+
+        @param entity Entity to update, all entities if None
+        @return Number of entities reinserted
+        """
+
+        if entity is None: entities = list(self.__leaves)
+        else: entities = (entity,)
+
+        moved = 0
+        for entity in entities:
+            leaf = self.__leaves[entity]
+            minimum, maximum, unbounded = self.__entity_box(entity)
+
+            if unbounded != leaf.unbounded:
+                leaf.unbounded = unbounded
+                if unbounded: self.__unbounded[entity] = None
+                else: self.__unbounded.pop(entity, None)
+
+            elif _contains(leaf, minimum, maximum): continue
+
+            self.__remove_leaf(leaf)
+            leaf.minimum = minimum - self.margin
+            leaf.maximum = maximum + self.margin
+            self.__insert_leaf(leaf)
+            moved += 1
+
+        return moved
+
+    def clear(self):
+        """ Remove all entities. """
+        self.root = None
+        self.__leaves.clear()
+        self.__unbounded.clear()
+
+    def query_frustum(self, frustum: Frustum) -> list["Entity"]:
+        """
+        Get entities that are (possibly) visible in the frustum.
+
+        Subtrees fully inside the frustum are collected without testing
+        them further, leaves of intersecting subtrees are tested with the
+        entity's own bounds.
+
+        @param frustum View frustum
+        @return Visible entities
+        """
+
+        result = list(self.__unbounded)
+        if self.root is None: return result
+
+        stack = [(self.root, False)]
+        while stack:
+            node, inside = stack.pop()
+
+            if not inside:
+                classification = frustum.classify_aabb(node.minimum, node.maximum)
+                if classification == Frustum.OUTSIDE: continue
+                inside = classification == Frustum.INSIDE
+
+            if node.is_leaf:
+                if node.unbounded: continue
+                if inside or node.entity.in_frustum(frustum): result.append(node.entity)
+
+            else:
+                stack.append((node.left, inside))
+                stack.append((node.right, inside))
+
+        return result
+
+    def query_aabb(self, minimum: glm.vec3, maximum: glm.vec3) -> list["Entity"]:
+        """
+        Get entities whose boxes overlap the axis-aligned box.
+
+        Leaf boxes are enlarged by the margin, so this is a broad phase and
+        the result can contain entities that are close to but not touching
+        the box.
+
+        @param minimum Minimum corner of the box
+        @param maximum Maximum corner of the box
+        @return Overlapping entities
+        """
+
+        result = []
+        if self.root is None: return result
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if not _overlaps(node, minimum, maximum): continue
+
+            if node.is_leaf: result.append(node.entity)
+            else:
+                stack.append(node.left)
+                stack.append(node.right)
+
+        return result
+
+    def query_sphere(self, center: glm.vec3, radius: float) -> list["Entity"]:
+        """
+        Get entities whose boxes overlap the sphere.
+
+        @param center Center of the sphere
+        @param radius Radius of the sphere
+        @return Overlapping entities
+        """
+
+        result = []
+        if self.root is None: return result
+
+        radius2 = radius * radius
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+
+            closest = glm.clamp(center, node.minimum, node.maximum)
+            if glm.distance2(closest, center) > radius2: continue
+
+            if node.is_leaf: result.append(node.entity)
+            else:
+                stack.append(node.left)
+                stack.append(node.right)
+
+        return result
+
+    def query_ray(self,
+            origin: glm.vec3,
+            direction: glm.vec3,
+            max_distance: float = inf
+            ) -> list[tuple[float, "Entity"]]:
+        """
+        Get entities whose boxes are hit by the ray.
+
+        @param origin Origin of the ray
+        @param direction Direction of the ray, distances are in its units
+        @param max_distance Ignore hits further than this
+        @return Distances along the ray where it enters the boxes and entities, nearest first
+        """
+
+        result = []
+        if self.root is None: return result
+
+        # Slab test, infinite inverse components make parallel slabs
+        # either always or never overlap
+        inverse = glm.vec3(
+            1.0 / direction.x if direction.x != 0.0 else inf,
+            1.0 / direction.y if direction.y != 0.0 else inf,
+            1.0 / direction.z if direction.z != 0.0 else inf
+        )
+
+        def entry(node: SpatialNode) -> Optional[float]:
+            near = 0.0
+            far = max_distance
+
+            for axis in range(3):
+                if inverse[axis] == inf:
+                    if origin[axis] < node.minimum[axis] or origin[axis] > node.maximum[axis]: return None
+                    continue
+
+                t0 = (node.minimum[axis] - origin[axis]) * inverse[axis]
+                t1 = (node.maximum[axis] - origin[axis]) * inverse[axis]
+                if t0 > t1: t0, t1 = t1, t0
+
+                near = max(near, t0)
+                far = min(far, t1)
+                if near > far: return None
+
+            return near
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+
+            distance = entry(node)
+            if distance is None: continue
+
+            if node.is_leaf: result.append((distance, node.entity))
+            else:
+                stack.append(node.left)
+                stack.append(node.right)
+
+        result.sort(key=lambda hit: hit[0])
+        return result
+
+    def query_entity(self, entity: "Entity") -> list["Entity"]:
+        """ Get other entities whose boxes overlap the entity's box. """
+
+        leaf = self.__leaves[entity]
+        return [other for other in self.query_aabb(leaf.minimum, leaf.maximum) if other is not entity]
+
+    def __entity_box(self, entity: "Entity") -> tuple[glm.vec3, glm.vec3, bool]:
+        box = entity.aabb()
+        if box is None: return glm.vec3(entity.position), glm.vec3(entity.position), True
+        return box[0], box[1], False
+
+    def __insert_leaf(self, leaf: SpatialNode):
+        if self.root is None:
+            self.root = leaf
+            leaf.parent = None
+            return
+
+        # Descend to the sibling that increases the total surface area the least
+        sibling = self.root
+        while not sibling.is_leaf:
+            area = _surface_area(sibling.minimum, sibling.maximum)
+            combined = _surface_area(glm.min(sibling.minimum, leaf.minimum), glm.max(sibling.maximum, leaf.maximum))
+
+            # Cost of making a new parent for the leaf and this node
+            cost = 2.0 * combined
+
+            # Minimum cost of pushing the leaf further down
+            inheritance = 2.0 * (combined - area)
+
+            child_costs = []
+            for child in (sibling.left, sibling.right):
+                enlarged = _surface_area(glm.min(child.minimum, leaf.minimum), glm.max(child.maximum, leaf.maximum))
+                if child.is_leaf: child_costs.append(enlarged + inheritance)
+                else: child_costs.append(enlarged - _surface_area(child.minimum, child.maximum) + inheritance)
+
+            if cost < child_costs[0] and cost < child_costs[1]: break
+
+            sibling = sibling.left if child_costs[0] < child_costs[1] else sibling.right
+
+        old_parent = sibling.parent
+
+        parent = SpatialNode(glm.min(sibling.minimum, leaf.minimum), glm.max(sibling.maximum, leaf.maximum))
+        parent.parent = old_parent
+        parent.left = sibling
+        parent.right = leaf
+        parent.height = sibling.height + 1
+        sibling.parent = parent
+        leaf.parent = parent
+
+        if old_parent is None: self.root = parent
+        elif old_parent.left is sibling: old_parent.left = parent
+        else: old_parent.right = parent
+
+        self.__refit(parent)
+
+    def __remove_leaf(self, leaf: SpatialNode):
+        if leaf is self.root:
+            self.root = None
+            return
+
+        parent = leaf.parent
+        grandparent = parent.parent
+        sibling = parent.right if parent.left is leaf else parent.left
+
+        # Sibling takes the parent's place
+        sibling.parent = grandparent
+        if grandparent is None: self.root = sibling
+        elif grandparent.left is parent: grandparent.left = sibling
+        else: grandparent.right = sibling
+
+        leaf.parent = None
+
+        self.__refit(grandparent)
+
+    def __refit(self, node: Optional[SpatialNode]):
+        """ Rebalance and refit boxes from node up to the root. """
+
+        while node is not None:
+            node = self.__balance(node)
+
+            node.minimum = glm.min(node.left.minimum, node.right.minimum)
+            node.maximum = glm.max(node.left.maximum, node.right.maximum)
+            node.height = 1 + max(node.left.height, node.right.height)
+
+            node = node.parent
+
+    def __balance(self, node: SpatialNode) -> SpatialNode:
+        """ Rotate the taller grandchild up if children heights differ by more than one. """
+
+        if node.is_leaf or node.height < 2: return node
+
+        balance = node.right.height - node.left.height
+        if balance > 1: return self.__rotate(node, node.right, node.left)
+        if balance < -1: return self.__rotate(node, node.left, node.right)
+        return node
+
+    def __rotate(self, node: SpatialNode, tall: SpatialNode, short: SpatialNode) -> SpatialNode:
+        """ Rotate tall child of node up, returns the node that took node's place. """
+
+        # Tall child replaces node
+        tall.parent = node.parent
+        node.parent = tall
+
+        if tall.parent is None: self.root = tall
+        elif tall.parent.left is node: tall.parent.left = tall
+        else: tall.parent.right = tall
+
+        # Taller grandchild stays under the tall child, the other moves under node
+        if tall.left.height > tall.right.height: keep, move = tall.left, tall.right
+        else: keep, move = tall.right, tall.left
+
+        tall.left = node
+        tall.right = keep
+
+        if node.left is tall: node.left = move
+        else: node.right = move
+        move.parent = node
+
+        node.minimum = glm.min(short.minimum, move.minimum)
+        node.maximum = glm.max(short.maximum, move.maximum)
+        node.height = 1 + max(short.height, move.height)
+
+        return tall
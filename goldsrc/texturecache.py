@@ -0,0 +1,299 @@
+"""
+
+    GoldSrc Python
+    MIT © Kadir Aksoy
+    https://github.com/kadir014/goldsrc-python
+
+"""
+
+from typing import Optional, Union, TYPE_CHECKING
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from pathlib import Path
+import hashlib
+
+import pygame
+import moderngl
+
+if TYPE_CHECKING:
+    from .renderer import Renderer
+
+
+# Default VRAM budget of the texture cache in bytes
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class SharedTexture:
+    """
+    Texture uploaded to the GPU and shared by its users.
+
+    Users acquire a reference to the shared texture and release it when
+    they're done. Unreferenced textures stay in the cache until they are
+    evicted to keep the cache under its memory budget.
+    """
+
+    def __init__(self,
+            cache: "TextureCache",
+            digest: bytes,
+            texture: Union[moderngl.Texture, moderngl.TextureArray, moderngl.TextureCube],
+            nbytes: int
+            ):
+        self.cache = cache
+        self.digest = digest
+        self.texture = texture
+        self.nbytes = nbytes
+        self.references = 0
+
+        # Cache keys resolving to this texture
+        self.keys = []
+
+    @property
+    def size(self) -> tuple[int, ...]:
+        """ Size of the texture in pixels. """
+        return self.texture.size
+
+    def use(self, location: int = 0):
+        """ Bind texture to texture unit. """
+        self.texture.use(location)
+
+    def acquire(self) -> "SharedTexture":
+        """ Acquire a reference. """
+        self.references += 1
+        return self
+
+    def release(self):
+        """ Release a reference, the cache decides when to free the texture. """
+
+        self.references -= 1
+        if self.references == 0: self.cache.unused(self)
+
+
+class TextureCache:
+    """
+    Cache of textures keyed by their source and sampler options.
+
+    Loading the same source again hands out a new reference to the already
+    uploaded texture. Sources that are not in the cache yet are decoded and
+    hashed, so identical images at different paths are only uploaded once.
+
+    Unreferenced textures are kept in LRU order and the least recently used
+    ones are freed when the cache goes over max_bytes.
+    """
+
+    def __init__(self, renderer: "Renderer", max_bytes: int = DEFAULT_MAX_BYTES):
+        self.renderer = renderer
+        self.max_bytes = max_bytes
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.duplicates = 0
+        self.evictions = 0
+        self.nbytes = 0
+
+        self.__textures = {}
+        self.__digests = {}
+        self.__unused = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__digests)
+
+    def reset_counters(self):
+        """ Reset hit, miss, duplicate and eviction counters. """
+        self.hits = 0
+        self.misses = 0
+        self.duplicates = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[SharedTexture]:
+        """ Get a new reference to cached texture, None if it isn't cached. """
+
+        texture = self.__textures.get(key)
+        if texture is None: return None
+
+        self.hits += 1
+        self.__unused.pop(texture.digest, None)
+        return texture.acquire()
+
+    def load(self,
+            filepath: Union[Path, str],
+            repeat: bool = False,
+            build_mipmaps: bool = False,
+            format: str = "RGB",
+            flip: bool = True
+            ) -> SharedTexture:
+        """
+        Get a reference to texture of image file, loading it if needed.
+
+        @param filepath Path to the image file
+        @param repeat Repeat texture on both axes
+        @param build_mipmaps Build mipmaps after uploading
+        @param format Pixel format to upload the image in
+        @param flip Flip the image vertically
+        @return Shared texture
+        """
+
+        options = (repeat, build_mipmaps, format, flip)
+        key = ("2d", str(Path(filepath).resolve()), *options)
+
+        texture = self.get(key)
+        if texture is not None: return texture
+
+        surface = pygame.image.load(filepath)
+        size = surface.get_size()
+        pixels = pygame.image.tostring(surface, format, flip)
+
+        def upload() -> moderngl.Texture:
+            texture = self.renderer.context.texture(size, len(format), pixels)
+            texture.repeat_x = repeat
+            texture.repeat_y = repeat
+            if build_mipmaps: texture.build_mipmaps()
+            return texture
+
+        nbytes = len(pixels)
+        if build_mipmaps: nbytes = nbytes * 4 // 3
+
+        return self.__add(key, self.__digest(pixels, size, *options), upload, nbytes)
+
+    def load_array(self,
+            filepaths: list[Union[Path, str]],
+            repeat: bool = False,
+            build_mipmaps: bool = False,
+            format: str = "RGB",
+            flip: bool = True
+            ) -> SharedTexture:
+        """
+        Get a reference to texture array of image files, loading it if needed.
+
+        Images are scaled to the size of the largest one, UV coordinates
+        cover the whole layer so meshes don't need to be remapped.
+
+        @param filepaths Paths to the image files, one per layer
+        @param repeat Repeat texture on both axes
+        @param build_mipmaps Build mipmaps after uploading
+        @param format Pixel format to upload the images in
+        @param flip Flip the images vertically
+        @return Shared texture
+        """
+
+        options = (repeat, build_mipmaps, format, flip)
+        key = ("array", tuple(str(Path(filepath).resolve()) for filepath in filepaths), *options)
+
+        texture = self.get(key)
+        if texture is not None: return texture
+
+        surfaces = [pygame.image.load(filepath) for filepath in filepaths]
+        size = (
+            max(surface.get_width() for surface in surfaces),
+            max(surface.get_height() for surface in surfaces)
+        )
+
+        layers = []
+        for surface in surfaces:
+            if surface.get_size() != size:
+                # Only 24 and 32-bit surfaces can be smoothly scaled
+                rgba = pygame.image.fromstring(
+                    pygame.image.tostring(surface, "RGBA"),
+                    surface.get_size(),
+                    "RGBA"
+                )
+                surface = pygame.transform.smoothscale(rgba, size)
+
+            layers.append(pygame.image.tostring(surface, format, flip))
+
+        pixels = b"".join(layers)
+
+        def upload() -> moderngl.TextureArray:
+            texture = self.renderer.context.texture_array((*size, len(layers)), len(format), pixels)
+            texture.repeat_x = repeat
+            texture.repeat_y = repeat
+            if build_mipmaps: texture.build_mipmaps()
+            return texture
+
+        nbytes = len(pixels)
+        if build_mipmaps: nbytes = nbytes * 4 // 3
+
+        return self.__add(key, self.__digest(pixels, (*size, len(layers)), *options), upload, nbytes)
+
+    def load_cube(self,
+            filepaths: tuple[Union[Path, str], ...],
+            flip: bool = False
+            ) -> SharedTexture:
+        """
+        Get a reference to cubemap texture of image files, loading it if needed.
+
+        @param filepaths Paths to the faces in +X, -X, +Y, -Y, +Z, -Z order
+        @param flip Flip the images vertically
+        @return Shared texture
+        """
+
+        key = ("cube", tuple(str(Path(filepath).resolve()) for filepath in filepaths), flip)
+
+        texture = self.get(key)
+        if texture is not None: return texture
+
+        surfaces = [pygame.image.load(filepath) for filepath in filepaths]
+        size = surfaces[0].get_size()
+        pixels = b"".join(pygame.image.tostring(surface, "RGB", flip) for surface in surfaces)
+
+        def upload() -> moderngl.TextureCube:
+            return self.renderer.context.texture_cube(size, 3, pixels)
+
+        return self.__add(key, self.__digest(pixels, size, "cube"), upload, len(pixels))
+
+    def unused(self, texture: SharedTexture):
+        """ Move texture without references to the eviction queue. """
+
+        self.__unused[texture.digest] = texture
+        self.evict()
+
+    def evict(self, max_bytes: Optional[int] = None):
+        """
+        Free least recently used unreferenced textures until the cache fits.
+
+        @param max_bytes Memory budget to fit in, defaults to max_bytes
+        """
+
+        if max_bytes is None: max_bytes = self.max_bytes
+
+        while self.nbytes > max_bytes and len(self.__unused) > 0:
+            _, texture = self.__unused.popitem(last=False)
+
+            for key in texture.keys: del self.__textures[key]
+            del self.__digests[texture.digest]
+
+            texture.texture.release()
+            self.nbytes -= texture.nbytes
+            self.evictions += 1
+
+    def clear(self):
+        """ Free all unreferenced textures. """
+        self.evict(0)
+
+    def __digest(self, pixels: bytes, size: tuple[int, int], *options) -> bytes:
+        hasher = hashlib.sha1(pixels)
+        hasher.update(repr((size, options)).encode("ascii"))
+        return hasher.digest()
+
+    def __add(self, key: Hashable, digest: bytes, upload, nbytes: int) -> SharedTexture:
+        self.misses += 1
+
+        # Same content was already uploaded from another source
+        texture = self.__digests.get(digest)
+
+        if texture is not None:
+            self.duplicates += 1
+            self.__unused.pop(digest, None)
+
+        else:
+            texture = SharedTexture(self, digest, upload(), nbytes)
+            self.__digests[digest] = texture
+            self.nbytes += nbytes
+
+        texture.keys.append(key)
+        self.__textures[key] = texture
+
+        texture.acquire()
+        self.evict()
+        return texture
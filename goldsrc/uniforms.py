@@ -0,0 +1,101 @@
+"""
+
+    GoldSrc Python
+    MIT © Kadir Aksoy
+    https://github.com/kadir014/goldsrc-python
+
+"""
+
+from typing import Any, Optional
+
+import moderngl
+import glm
+
+
+# GLM types that are written to uniforms as raw bytes
+GLM_TYPES = (glm.mat2, glm.mat3, glm.mat4, glm.vec2, glm.vec3, glm.vec4)
+
+
+class UniformStats:
+    """
+    Counts of uniform writes issued and skipped.
+
+    Counts of the current frame are moved to last_issued and last_skipped
+    when a new frame starts, so they can be displayed while the next frame
+    is counted.
+    """
+
+    def __init__(self):
+        self.issued = 0
+        self.skipped = 0
+
+        self.last_issued = 0
+        self.last_skipped = 0
+
+    def new_frame(self):
+        """ Start counting a new frame. """
+
+        self.last_issued = self.issued
+        self.last_skipped = self.skipped
+
+        self.issued = 0
+        self.skipped = 0
+
+
+class UniformCache:
+    """
+    Uniform writer of a shader program that skips redundant writes.
+
+    Uniform handles are resolved once and the last value written to each
+    uniform is kept, writing the same value again is skipped. Programs are
+    shared between models, so all models using a program share its cache.
+
+    GLM values (matrices, vectors) are written as raw bytes, other values
+    are assigned as they are.
+    """
+
+    def __init__(self, program: moderngl.Program, stats: UniformStats):
+        self.program = program
+        self.stats = stats
+
+        self.__uniforms = {}
+        self.__values = {}
+
+    def uniform(self, name: str) -> Optional[moderngl.Uniform]:
+        """ Get uniform handle, None if the program doesn't have (or use) it. """
+
+        if name not in self.__uniforms:
+            self.__uniforms[name] = self.program.get(name, None)
+
+        return self.__uniforms[name]
+
+    def set(self, name: str, value: Any) -> bool:
+        """
+        Write uniform value if it's different from the last written value.
+
+        Uniforms the program doesn't have are ignored.
+
+        @param name Uniform name
+        @param value New value
+        @return True if the value was written
+        """
+
+        uniform = self.uniform(name)
+        if uniform is None: return False
+
+        if isinstance(value, GLM_TYPES): value = value.to_bytes()
+
+        if self.__values.get(name) == value:
+            self.stats.skipped += 1
+            return False
+
+        if isinstance(value, bytes): uniform.write(value)
+        else: uniform.value = value
+
+        self.__values[name] = value
+        self.stats.issued += 1
+        return True
+
+    def invalidate(self):
+        """ Forget written values, e.g. after the program was modified directly. """
+        self.__values.clear()
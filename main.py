@@ -7,6 +7,7 @@
 """
 
 import os
+import multiprocessing
 os.environ["PY_USED_FREEZER"] = "none" # For setting up PyInstaller or cx_Freeze
 
 from goldsrc import Engine
@@ -14,6 +15,9 @@ from scenes.game import Game
 
 
 if __name__ == "__main__":
+    # Frozen builds would run the game again in every worker process
+    multiprocessing.freeze_support()
+
     engine = Engine()
 
     engine.add_scene(Game(engine))
@@ -614,7 +614,8 @@ class Game(Scene):
         self.ground = Entity(
             self.engine,
             position=glm.vec3(0.0, -4.0, 0.0),
-            model=ground_model
+            model=ground_model,
+            static=True
         )
         self.ground.rotation.x += pi / 2
         self.add_entity(self.ground)
@@ -629,7 +630,8 @@ class Game(Scene):
         self.box = Entity(
             self.engine,
             position=glm.vec3(5.0, -2.5, 0.0),
-            model=box_model
+            model=box_model,
+            static=True
         )
         self.add_entity(self.box)
 
@@ -649,7 +651,8 @@ class Game(Scene):
         brick_model = BasicAnimatedModel.from_obja(
             self.engine,
             source_path("assets", "animations", "sequence.obja"),
-            program_name="flat"
+            program_name="flat",
+            fps=60.0
         )
         self.brick = Entity(
             self.engine,
@@ -663,6 +666,9 @@ class Game(Scene):
         self.player = Player(self.engine, glm.vec3(0.0))
         self.add_entity(self.player)
 
+        # Ground and box never move, draw them from merged buffers
+        self.build_static()
+
         self.ui = Container(self.engine)
 
         self.settings = Settings(self.ui, (0, 0), (1280, 720))